@@ -6,11 +6,9 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
-from anthropic import Anthropic
-
 from .parser import Blueprint
 from .constants import DEFAULT_MODEL
-from .utils import check_anthropic_api_key
+from .utils import check_anthropic_api_key, create_anthropic_client
 
 
 class ArchitecturalPattern(Enum):
@@ -71,7 +69,7 @@ class AdaptiveGenerationStrategist:
         check_anthropic_api_key("adaptive generation strategies")
         
         
-        self.client = Anthropic()
+        self.client = create_anthropic_client()
         
         self._load_blueprint_spec()
     
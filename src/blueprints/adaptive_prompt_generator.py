@@ -6,12 +6,16 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
-from anthropic import Anthropic
-
 from .parser import Blueprint
 from .constants import DEFAULT_MODEL
 from .logging_config import get_logger
-from .utils import check_anthropic_api_key
+from .utils import check_anthropic_api_key, create_anthropic_client
+
+# Closing instruction of every generation prompt; CodeGenerator extracts the first
+# fenced block, so anything after its closing fence is wasted output
+_OUTPUT_INSTRUCTION = (
+    "Return ONLY the code in one fenced block, with no tests and nothing after the closing fence."
+)
 
 
 @dataclass
@@ -196,7 +200,7 @@ class AdaptivePromptGenerator:
         check_anthropic_api_key("adaptive prompt generation")
         
         
-        self.client = Anthropic()
+        self.client = create_anthropic_client()
         
         self.history = PromptHistory(storage_path)
         self.optimizer = PromptOptimizer(self.client)
@@ -317,7 +321,8 @@ Return ONLY: simple, medium, or complex
                            complexity: str, dependency_versions: Optional[Dict[str, str]]) -> Tuple[str, str]:
         """Generate a new optimized prompt using Claude meta-reasoning."""
         
-        context_summary = "\n".join(context_parts[:3])  # Limit for token efficiency
+        # Joined once: sampled for the meta-prompt, then prefixed to the result
+        context_text = "\n".join(context_parts)
         
         meta_prompt = f"""
 BLUEPRINT SPECIFICATION:
@@ -333,7 +338,7 @@ Description: {blueprint.description}
 Content: {blueprint.raw_content[:1500]}
 
 CONTEXT AVAILABLE:
-{context_summary[:1000] if context_summary else "None"}
+{context_text[:1000] if context_text else "None"}
 
 DEPENDENCY VERSIONS:
 {json.dumps(dependency_versions) if dependency_versions else "None"}
@@ -378,7 +383,8 @@ Return ONLY the prompt without explanations or meta-commentary.
         
         self.history.templates[template_id] = template
         
-        return generated_prompt, template_id
+        # The template is stored without context so other blueprints can reuse it
+        return self._frame_prompt(generated_prompt, context_text), template_id
     
     def _customize_template(self, template: str, blueprint: Blueprint,
                           context_parts: List[str], 
@@ -388,11 +394,15 @@ Return ONLY the prompt without explanations or meta-commentary.
         customized = template.replace("{{MODULE_NAME}}", blueprint.module_name)
         customized = customized.replace("{{DESCRIPTION}}", blueprint.description)
         
-        if context_parts:
-            context_section = "\n".join(context_parts[:3])
-            customized = f"{context_section}\n\n{customized}"
-        
-        return customized
+        return self._frame_prompt(customized, "\n".join(context_parts))
+
+    @staticmethod
+    def _frame_prompt(prompt: str, context_text: str) -> str:
+        """Lead with the curated context as the cacheable prefix and end with the output instruction."""
+        prompt = f"{prompt}\n\n{_OUTPUT_INSTRUCTION}"
+        if not context_text:
+            return prompt
+        return f"{context_text}\n\n{prompt}"
     
     def _consider_prompt_improvement(self, prompt_id: str):
         """Consider improving a prompt if it's failing too much."""
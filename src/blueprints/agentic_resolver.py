@@ -7,12 +7,10 @@ from dataclasses import dataclass, field
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
-from anthropic import Anthropic
-
 from .parser import Blueprint, BlueprintReference, BlueprintParser
 from .constants import DEFAULT_MODEL
 from .logging_config import get_logger
-from .utils import check_anthropic_api_key
+from .utils import check_anthropic_api_key, create_anthropic_client
 from .resolver import ResolvedBlueprint
 
 
@@ -333,7 +331,7 @@ class AgenticDependencyResolver:
         logger.debug("API key check passed")
         
         logger.debug("Creating Anthropic client...")
-        self.client = Anthropic()
+        self.client = create_anthropic_client()
         logger.debug("Anthropic client created")
         
         # Initialize components
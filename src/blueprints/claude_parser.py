@@ -6,13 +6,11 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 
-from anthropic import Anthropic
-
 # Import the existing data structures
 from .parser import Blueprint, BlueprintReference, Method, Component
 from .constants import DEFAULT_MODEL
 from .logging_config import get_logger
-from .utils import load_blueprint_spec, check_anthropic_api_key
+from .utils import load_blueprint_spec, check_anthropic_api_key, create_anthropic_client
 
 
 class ClaudeBlueprintParser:
@@ -27,7 +25,7 @@ class ClaudeBlueprintParser:
         logger.debug("API key check passed")
         
         logger.debug("Creating Anthropic client...")
-        self.client = Anthropic()
+        self.client = create_anthropic_client()
         logger.debug("Anthropic client created")
         
         logger.debug("Loading blueprint specification...")
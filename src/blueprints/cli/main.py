@@ -5,24 +5,12 @@ from pathlib import Path
 from typing import Optional
 
 from blueprints import __version__
+from blueprints.code_generator import get_file_extension
 from blueprints.factory import create_quality_enhanced_generator
 from blueprints.resolver import create_smart_resolver
 from blueprints.logging_config import setup_logging, get_logger
 
 
-def get_file_extension(language: str) -> str:
-    """Get file extension for language."""
-    extensions = {
-        "python": ".py",
-        "javascript": ".js", 
-        "typescript": ".ts",
-        "java": ".java",
-        "go": ".go",
-        "rust": ".rs"
-    }
-    return extensions.get(language.lower(), ".txt")
-
-
 def find_project_blueprint(path: Path) -> Path:
     """Find main blueprint file in project directory."""
     if not path.is_dir():
@@ -63,6 +51,10 @@ def main(ctx: click.Context, verbose: bool) -> None:
               help="Enable iterative quality improvement (default: enabled)")
 @click.option("--quality-iterations", type=int, default=2,
               help="Maximum quality improvement iterations (default: 2)")
+@click.option("--cache/--no-cache", default=True,
+              help="Reuse cached Claude responses for identical requests (default: enabled)")
+@click.option("--cache-dir", type=click.Path(file_okay=False, path_type=Path),
+              help="Response cache directory (default: ~/.cache/blueprints)")
 @click.option("--verbose", "-v", is_flag=True, 
               help="Verbose output")
 @click.pass_context
@@ -75,6 +67,8 @@ def generate(
     force: bool,
     quality_improvement: bool,
     quality_iterations: int,
+    cache: bool,
+    cache_dir: Optional[Path],
     verbose: bool
 ) -> None:
     """Generate source code from a blueprint file."""
@@ -115,7 +109,9 @@ def generate(
         generator = create_quality_enhanced_generator(
             api_key=api_key, 
             enable_quality_improvement=quality_improvement,
-            max_quality_iterations=quality_iterations
+            max_quality_iterations=quality_iterations,
+            cache_dir=cache_dir,
+            use_cache=cache
         )
         
         logger.info("Generating code...")
@@ -142,6 +138,12 @@ def generate(
               help="Enable iterative quality improvement (default: enabled)")
 @click.option("--quality-iterations", type=int, default=2,
               help="Maximum quality improvement iterations (default: 2)")
+@click.option("--cache/--no-cache", default=True,
+              help="Reuse cached Claude responses for identical requests (default: enabled)")
+@click.option("--cache-dir", type=click.Path(file_okay=False, path_type=Path),
+              help="Response cache directory (default: ~/.cache/blueprints)")
+@click.option("--batch", is_flag=True,
+              help="Submit generation through the Message Batches API (cheaper, slower, no verification)")
 @click.option("--verbose", "-v", is_flag=True,
               help="Verbose output")
 @click.pass_context
@@ -153,6 +155,9 @@ def generate_project(
     force: bool,
     quality_improvement: bool,
     quality_iterations: int,
+    cache: bool,
+    cache_dir: Optional[Path],
+    batch: bool,
     verbose: bool
 ) -> None:
     """Generate entire project from main blueprint."""
@@ -187,16 +192,23 @@ def generate_project(
         generator = create_quality_enhanced_generator(
             api_key=api_key, 
             enable_quality_improvement=quality_improvement,
-            max_quality_iterations=quality_iterations
+            max_quality_iterations=quality_iterations,
+            cache_dir=cache_dir,
+            use_cache=cache
         )
         
         logger.info("Generating project files...")
         # Use the target directory, not current directory
         output_dir = path if path.is_dir() else path.parent
         logger.debug(f"Output directory: {output_dir}")
-        generated_files = generator.generate_project(
-            resolved, output_dir, language, force, blueprint_file, True
-        )
+        if batch:
+            generated_files = generator.generate_project_batched(
+                resolved, output_dir, language, force, blueprint_file
+            )
+        else:
+            generated_files = generator.generate_project(
+                resolved, output_dir, language, force, blueprint_file, True
+            )
         
         click.echo(f"✅ Generated {len(generated_files)} files:")
         for module_name, file_path in generated_files.items():
@@ -1,29 +1,319 @@
 """Core code generation functionality using Claude API."""
 
+import ast
+import builtins
+import hashlib
+import json
+import mmap
+import os
+import random
 import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-
-from anthropic import Anthropic
+from typing import TYPE_CHECKING, Callable, ClassVar, Dict, Iterable, List, Optional, Set, Tuple
 
 from .logging_config import get_logger
 from .parser import Blueprint
-from .resolver import ResolvedBlueprint, create_smart_resolver
-from .adaptive_prompt_generator import AdaptivePromptBuilder
-from .intelligent_context_curator import SmartContextBuilder
-from .iterative_quality_improver import QualityEnhancedCodeGenerator
+from .prompt_builder import PromptBuilder
 from .config import config as default_config
-from .verifier import CodeVerifier
+from .constants import CURATED_CONTEXT_END
+from .utils import create_anthropic_client
+
+if TYPE_CHECKING:
+    from .adaptive_prompt_generator import AdaptivePromptBuilder
+    from .intelligent_context_curator import SmartContextBuilder
+    from .resolver import ResolvedBlueprint
+
+logger = get_logger('generator')
+
+_FILE_EXTENSIONS = {
+    "python": ".py",
+    "javascript": ".js",
+    "typescript": ".ts",
+    "java": ".java",
+    "go": ".go",
+    "rust": ".rs",
+    "cpp": ".cpp",
+    "c": ".c",
+}
+
+# Dependency lines in main.md; an optional "[extra]" suffix is matched but not
+# captured, and lines without a version (e.g. "- name - description") still match
+_VERSION_RE = re.compile(
+    r"- (?P<name>[a-zA-Z0-9\-_]+)(?:\[[^\]]*\])?(?P<op>[><=~!]+)?(?P<version>[0-9.]+)?"
+)
+
+# On-disk cache of raw Claude responses; bump the version to invalidate old entries
+_RESPONSE_CACHE_VERSION = 1
+_DEFAULT_RESPONSE_CACHE_DIR = Path.home() / ".cache" / "blueprints"
+
+# Prompt prefixes shorter than roughly 1024 tokens are not cached by the API
+_MIN_CACHED_PREFIX_CHARS = 4096
+
+# Output budget for structured declarations responses: a floor plus room per
+# declaration, plus about one token per two characters of any given value
+_MIN_DECLARATION_TOKENS = 512
+_DECLARATION_TOKENS_PER_ITEM = 128
+
+# Body of a fenced code block that opens a response, up to the closing fence line
+_CODE_BLOCK_RE = re.compile(r"```[^\n]*\n(.*?)^```", re.DOTALL | re.MULTILINE)
+
+# Status checks on a processing message batch start at the first interval and
+# back off exponentially up to the second
+_BATCH_POLL_SECONDS = 5.0
+_BATCH_MAX_POLL_SECONDS = 60.0
+
+# Retried API calls wait a random delay of up to base * 2**attempt seconds, capped
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 30.0
+
+# Streamed tokens arrive continuously, so a read this long means a stalled
+# connection; it is retried instead of holding a request slot for minutes
+# (seconds; built into the SDK's own Timeout type when a generator is created)
+_STREAM_READ_TIMEOUT = 120.0
+_STREAM_CONNECT_TIMEOUT = 5.0
+
+# Caps in-flight generation requests across all generators and worker threads
+_request_slots = threading.BoundedSemaphore(max(1, default_config.max_concurrent_requests))
+
+
+class _RateLimiter:
+    """Token buckets for requests and tokens per minute, shared across threads."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.capacity_req = float(requests_per_minute)
+        self.capacity_tok = float(tokens_per_minute)
+        self.available_req = self.capacity_req
+        self.available_tok = self.capacity_tok
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, estimated_tokens: int) -> None:
+        """Block until both buckets can admit a request of estimated_tokens."""
+        if self.capacity_req <= 0 and self.capacity_tok <= 0:
+            return
+        # A request larger than the whole bucket would otherwise wait forever
+        tokens = min(float(estimated_tokens), self.capacity_tok)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                elapsed = now - self.updated
+                self.updated = now
+                self.available_req = min(
+                    self.capacity_req, self.available_req + elapsed * self.capacity_req / 60
+                )
+                self.available_tok = min(
+                    self.capacity_tok, self.available_tok + elapsed * self.capacity_tok / 60
+                )
+                req_wait = 0.0
+                if self.capacity_req > 0 and self.available_req < 1:
+                    req_wait = (1 - self.available_req) * 60 / self.capacity_req
+                tok_wait = 0.0
+                if self.capacity_tok > 0 and self.available_tok < tokens:
+                    tok_wait = (tokens - self.available_tok) * 60 / self.capacity_tok
+                if req_wait == 0 and tok_wait == 0:
+                    self.available_req -= 1 if self.capacity_req > 0 else 0
+                    self.available_tok -= tokens if self.capacity_tok > 0 else 0
+                    return
+            time.sleep(max(req_wait, tok_wait))
+
+
+# Keeps request starts under the account's limits instead of bursting into 429 backoffs
+_rate_limiter = _RateLimiter(
+    default_config.requests_per_minute, default_config.tokens_per_minute
+)
+
+# main.md files at least this large are scanned through mmap line by line
+_MMAP_THRESHOLD = 64 * 1024
+
+# Names a rendered constant or type alias may reference without any import
+_BUILTIN_NAMES = frozenset(dir(builtins))
+
+
+def _uses_only_builtins(expression: Optional[str]) -> bool:
+    """Check that expression parses and references nothing beyond builtins."""
+    if not expression:
+        return False
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        return False
+    return all(
+        node.id in _BUILTIN_NAMES for node in ast.walk(tree) if isinstance(node, ast.Name)
+    ) and not any(isinstance(node, (ast.Call, ast.Attribute)) for node in ast.walk(tree))
+
+
+def _declares_only_constants(blueprint: Blueprint) -> bool:
+    """Check whether a structured blueprint declares only constants and type aliases."""
+    if not blueprint.components:
+        return False
+    if blueprint.requirements or blueprint.sections or blueprint.dependencies:
+        return False
+    return all(component.type in ("constant", "type_alias") for component in blueprint.components)
+
+
+def render_trivial_python(blueprint: Blueprint) -> Optional[str]:
+    """Render a blueprint made only of self-contained constants and type aliases.
+
+    Returns None when the blueprint needs anything a model would have to infer:
+    references, notes, natural-language sections, or values using imports.
+    """
+    if not _declares_only_constants(blueprint) or blueprint.blueprint_refs or blueprint.notes:
+        return None
+
+    lines = [f'"""{blueprint.description}"""', ""] if blueprint.description else []
+    for component in blueprint.components:
+        if not _uses_only_builtins(component.value):
+            return None
+        annotation = component.properties.get("type") if component.type == "constant" else None
+        if annotation is not None and not _uses_only_builtins(annotation):
+            return None
+        target = f"{component.name}: {annotation}" if annotation else component.name
+        lines.append(f"{target} = {component.value}")
+    return "\n".join(lines) + "\n"
+
+
+def _render_declarations(blueprint: Blueprint, response: str) -> Optional[str]:
+    """Render a JSON declarations response as Python, or None if it is unusable."""
+    try:
+        data = json.loads(response)
+        imports = [str(line) for line in data.get("imports", [])]
+        definitions = [
+            (str(item["name"]), item.get("annotation"), str(item["value"]))
+            for item in data["definitions"]
+        ]
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+    if [name for name, _, _ in definitions] != [c.name for c in blueprint.components]:
+        return None
+
+    lines = [f'"""{blueprint.description}"""', ""] if blueprint.description else []
+    if imports:
+        lines.extend([*imports, ""])
+    for name, annotation, value in definitions:
+        target = f"{name}: {annotation}" if annotation else name
+        lines.append(f"{target} = {value}")
+    code = "\n".join(lines) + "\n"
+    try:
+        ast.parse(code)
+    except SyntaxError:
+        return None
+    return code
+
+
+def file_has_text(path: Path, text: str) -> bool:
+    """Check whether path already holds exactly text, reading it only when sizes match.
+
+    Lets writers skip rewriting unchanged files so their mtimes, and any
+    watcher or build tool keyed on them, are left alone.
+    """
+    data = text.encode("utf-8")
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def get_file_extension(language: str) -> str:
+    """Get the source file extension for a language, falling back to .txt."""
+    return _FILE_EXTENSIONS.get(language.lower(), ".txt")
+
+
+def extract_fenced_code(response: str) -> str:
+    """Return the code in a response's leading fenced block, or the stripped response."""
+    response = response.strip()
+    if not response.startswith("```"):
+        return response
+
+    match = _CODE_BLOCK_RE.match(response)
+    if not match:
+        # Unterminated fence: everything after the opening line is code
+        return response.partition("\n")[2]
+    code = match.group(1)
+    return code[:-1] if code.endswith("\n") else code
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Check whether an API error is transient: rate limits, overloads and connection failures."""
+    from anthropic import APIConnectionError, APIStatusError
+
+    if isinstance(error, APIConnectionError):
+        return True
+    return isinstance(error, APIStatusError) and (
+        error.status_code in (408, 409, 429) or error.status_code >= 500
+    )
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Pick a full-jitter backoff delay, waiting at least as long as a retry-after header asks."""
+    from anthropic import APIStatusError
+
+    delay = random.uniform(0, min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** attempt))
+    if isinstance(error, APIStatusError):
+        try:
+            retry_after = float(error.response.headers.get("retry-after", 0))
+        except ValueError:
+            retry_after = 0.0
+        delay = max(delay, min(retry_after, _RETRY_MAX_DELAY))
+    return delay
+
+
+def _raise_if_cancelled(cancel: Optional[threading.Event]) -> None:
+    """Stop a request whose result is no longer wanted."""
+    if cancel is not None and cancel.is_set():
+        raise RuntimeError("Request cancelled")
+
+
+def _warn_if_truncated(stop_reason: Optional[str], max_tokens: int) -> None:
+    """Warn when a response ran out of output tokens, since its code is likely cut off."""
+    if stop_reason == "max_tokens":
+        logger.warning(
+            f"Response stopped at the {max_tokens}-token limit; generated code may be truncated"
+        )
+
+
+def _build_message_content(prompt: str):
+    """Mark the curated dependency context at the head of a prompt as cacheable."""
+    split = prompt.find(CURATED_CONTEXT_END)
+    if split == -1:
+        return prompt
+    split += len(CURATED_CONTEXT_END)
+    if split < _MIN_CACHED_PREFIX_CHARS:
+        return prompt
+
+    content = [{"type": "text", "text": prompt[:split], "cache_control": {"type": "ephemeral"}}]
+    if split < len(prompt):
+        content.append({"type": "text", "text": prompt[split:]})
+    return content
 
 
 class CodeGenerator:
     """Core code generator that handles Claude API interactions."""
 
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
-        """Initialize with API key and model configuration."""
-        logger = get_logger('generator')
-        
-        if Anthropic is None:
+    # Prompt and context builders load templates and specs from disk, so every
+    # instance shares one of each, created on first use.
+    _prompt_builder: ClassVar[Optional["AdaptivePromptBuilder"]] = None
+    _context_builder: ClassVar[Optional["SmartContextBuilder"]] = None
+    _builders_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        cache_dir: Optional[Path] = None,
+        use_cache: bool = True,
+    ):
+        """Initialize with API key, model and response cache configuration."""
+        # Imported here so CLI paths that never generate (e.g. --help) skip loading the SDK
+        try:
+            from anthropic import Timeout
+        except ImportError:
             raise ImportError("anthropic package is required for code generation. Install with: pip install anthropic")
             
         self.api_key = api_key or default_config.get_api_key()
@@ -36,13 +326,44 @@ class CodeGenerator:
             )
 
         logger.debug("Initializing Anthropic client...")
-        self.client = Anthropic(api_key=self.api_key)
+        # Retries are handled by _stream_response_text so they share its backoff and slot limit
+        self.client = create_anthropic_client(api_key=self.api_key, max_retries=0)
+        self._stream_timeout = Timeout(_STREAM_READ_TIMEOUT, connect=_STREAM_CONNECT_TIMEOUT)
         logger.debug("Anthropic client initialized successfully")
         self.model = model or default_config.default_model
+        # An explicitly requested model is used for every blueprint
+        self.light_model = None if model else (default_config.light_model or None)
         self.max_tokens = default_config.max_tokens
         self.temperature = default_config.temperature
-        self.prompt_builder = AdaptivePromptBuilder()
-        self.context_builder = SmartContextBuilder()
+        self.cache_dir = cache_dir or _DEFAULT_RESPONSE_CACHE_DIR
+        self.use_cache = use_cache
+        self.prompt_builder, self.context_builder = self._get_shared_builders()
+        self._declaration_prompts = PromptBuilder()
+        # Generated code keyed by a hash of everything that shapes the prompt
+        self._gen_memo: Dict[bytes, str] = {}
+        # Parsed main.md dependency versions keyed by (path, mtime_ns, size)
+        self._dependency_versions: Dict[Tuple[str, int, int], Dict[str, str]] = {}
+        # main.md found for each resolved start directory
+        self._main_md_paths: Dict[Path, Path] = {}
+        # Package directories already created for output paths
+        self._output_dirs: Set[Path] = set()
+        # Responses being fetched, keyed like the response cache, so identical
+        # concurrent requests share one API call
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    @staticmethod
+    def _get_shared_builders() -> Tuple["AdaptivePromptBuilder", "SmartContextBuilder"]:
+        """Return the prompt and context builders shared by all generators."""
+        with CodeGenerator._builders_lock:
+            if CodeGenerator._prompt_builder is None:
+                # Imported here so commands that never generate code skip loading them
+                from .adaptive_prompt_generator import AdaptivePromptBuilder
+                from .intelligent_context_curator import SmartContextBuilder
+
+                CodeGenerator._prompt_builder = AdaptivePromptBuilder()
+                CodeGenerator._context_builder = SmartContextBuilder()
+            return CodeGenerator._prompt_builder, CodeGenerator._context_builder
 
     def generate_single_blueprint(
         self,
@@ -52,16 +373,29 @@ class CodeGenerator:
         dependency_versions: Optional[Dict[str, str]] = None,
     ) -> str:
         """Generate code for a single blueprint with context."""
-        logger = get_logger('generator')
         logger.info(f"Generating {language} code for: {blueprint.module_name}")
         logger.debug(f"Context parts: {len(context_parts)}")
         if dependency_versions:
             logger.debug(f"Dependencies: {list(dependency_versions.keys())}")
+
+        code = self.render_trivial(blueprint, language)
+        if code is not None:
+            return code
         
-        prompt = self.prompt_builder.build_single_blueprint_prompt(
-            blueprint, language, context_parts, dependency_versions
-        )
-        return self._call_claude_api(prompt)
+        key = self._generation_key("single", blueprint, context_parts, language, dependency_versions)
+        code = self._memo_get(key)
+        if code is not None:
+            logger.debug(f"Reusing code generated for an identical blueprint: {blueprint.module_name}")
+            return code
+
+        code = self._generate_declarations(blueprint, context_parts, language)
+        if code is None:
+            prompt = self.prompt_builder.build_single_blueprint_prompt(
+                blueprint, language, context_parts, dependency_versions
+            )
+            code = self._call_claude_api(prompt, self.pick_model(blueprint))
+        self._memo_put(key, code)
+        return code
 
     def generate_natural_blueprint(
         self,
@@ -71,17 +405,123 @@ class CodeGenerator:
         dependency_versions: Optional[Dict[str, str]] = None,
     ) -> str:
         """Generate code from a natural language blueprint."""
-        logger = get_logger('generator')
         logger.info(f"Generating {language} code from natural blueprint: {blueprint.module_name}")
         logger.debug(f"Context parts: {len(context_parts)}")
         if dependency_versions:
             logger.debug(f"Dependencies: {list(dependency_versions.keys())}")
         
+        key = self._generation_key("natural", blueprint, context_parts, language, dependency_versions)
+        code = self._memo_get(key)
+        if code is not None:
+            logger.debug(f"Reusing code generated for an identical blueprint: {blueprint.module_name}")
+            return code
+
         prompt = self.prompt_builder.build_natural_blueprint_prompt(
             blueprint, language, context_parts, dependency_versions
         )
-        return self._call_claude_api(prompt)
+        code = self._call_claude_api(prompt)
+        self._memo_put(key, code)
+        return code
+
+    def _generation_key(
+        self,
+        kind: str,
+        blueprint: Blueprint,
+        context_parts: List[str],
+        language: str,
+        dependency_versions: Optional[Dict[str, str]],
+    ) -> bytes:
+        """Hash the inputs that determine generated code for a blueprint."""
+        digest = hashlib.blake2b(digest_size=16)
+        settings = (str(_RESPONSE_CACHE_VERSION), self.model, self.light_model or "", str(self.max_tokens))
+        for part in (*settings, kind, language, blueprint.raw_content, *context_parts):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        for name, version in sorted((dependency_versions or {}).items()):
+            digest.update(f"{name}{version}\0".encode("utf-8"))
+        return digest.digest()
     
+    def _memo_get(self, key: bytes) -> Optional[str]:
+        """Return code generated earlier for key, in this run or (when caching) a previous one.
+
+        Checked before any prompt is built, so a hit also skips the Claude calls
+        adaptive prompt building makes, whose prompts differ between runs.
+        """
+        code = self._gen_memo.get(key)
+        if code is None and self._caches_responses():
+            code = self._read_cache_entry(self.cache_dir / "generated" / f"{key.hex()}.txt")
+            if code is not None:
+                self._gen_memo[key] = code
+        return code
+
+    def _memo_put(self, key: bytes, code: str) -> None:
+        """Remember generated code for key, persisting it when caching is enabled."""
+        self._gen_memo[key] = code
+        if not self._caches_responses():
+            return
+        try:
+            self.write_text_atomic(self.cache_dir / "generated" / f"{key.hex()}.txt", code)
+        except OSError as e:
+            logger.debug(f"Could not write generated code cache entry: {e}")
+
+    def _caches_responses(self) -> bool:
+        """Check whether outputs are deterministic enough to cache on disk."""
+        return self.use_cache and self.temperature == 0
+
+    def render_trivial(self, blueprint: Blueprint, language: str) -> Optional[str]:
+        """Render constants-and-type-aliases-only blueprints locally, skipping the API call."""
+        if language.lower() != "python":
+            return None
+        code = render_trivial_python(blueprint)
+        if code is not None:
+            logger.info(f"Rendered {blueprint.module_name} directly (constants and type aliases only)")
+        return code
+
+    def _generate_declarations(
+        self, blueprint: Blueprint, context_parts: List[str], language: str
+    ) -> Optional[str]:
+        """Generate a constants-only Python module from a small JSON response.
+
+        Returns None when the blueprint has other components or the response
+        cannot be rendered, so the caller falls back to free-form generation.
+        """
+        if language.lower() != "python" or not _declares_only_constants(blueprint):
+            return None
+        code = _render_declarations(
+            blueprint, self._call_claude_api(*self._declarations_request(blueprint, context_parts))
+        )
+        if code is None:
+            logger.warning(f"Unusable declarations response for {blueprint.module_name}, regenerating as code")
+        return code
+
+    def _declarations_request(
+        self, blueprint: Blueprint, context_parts: List[str]
+    ) -> Tuple[str, str, int]:
+        """Return the prompt, model and output budget of a declarations request."""
+        prompt = self._declaration_prompts.build_declarations_prompt(blueprint, context_parts)
+        # A truncated response fails to parse and falls back, so a tight budget is safe
+        return prompt, self.pick_model(blueprint), self._declarations_max_tokens(blueprint)
+
+    def _declarations_max_tokens(self, blueprint: Blueprint) -> int:
+        """Estimate the output budget for a declarations response, capped at max_tokens."""
+        estimate = _DECLARATION_TOKENS_PER_ITEM * len(blueprint.components) + sum(
+            len(component.value or "") for component in blueprint.components
+        ) // 2
+        return min(self.max_tokens, max(_MIN_DECLARATION_TOKENS, estimate))
+
+    def pick_model(self, blueprint: Blueprint) -> str:
+        """Choose the light model for small structured blueprints, else the configured model."""
+        if not self.light_model or not blueprint.components:
+            return self.model
+        if blueprint.requirements or blueprint.sections or blueprint.dependencies:
+            return self.model
+        if any(component.base_class for component in blueprint.components):
+            return self.model
+        method_count = sum(len(component.methods) for component in blueprint.components)
+        if method_count > default_config.light_model_max_methods:
+            return self.model
+        return self.light_model
+
     def _make_api_call(self, prompt: str) -> str:
         """Make API call to Claude (alias for _call_claude_api for batch processing)."""
         return self._call_claude_api(prompt)
@@ -94,37 +534,163 @@ class CodeGenerator:
         max_retries: int = 3,
         project_root: Optional[Path] = None,
         main_md_path: Optional[Path] = None,
+        on_candidate: Optional[Callable[[str], None]] = None,
+        stop_on_success: bool = True,
     ) -> Tuple[str, List]:
-        """Generate code with simple verification (no retries)."""
+        """Generate code with verification, trying up to max_retries candidates.
+
+        Extra candidates are only requested when temperature > 0, since
+        deterministic requests would all return the same code. They run one at
+        a time, and with stop_on_success the first one that passes verification
+        is returned without requesting another; otherwise every candidate is
+        verified and the one with the fewest failures wins. With race_candidates
+        enabled they are requested concurrently instead, and the losing streams
+        are stopped once one passes. on_candidate, if given, receives the first
+        generated candidate before it is verified.
+        """
+        code = self.render_trivial(blueprint, language)
+        if code is not None:
+            return code, []
 
         if project_root is None and blueprint.file_path:
             project_root = blueprint.file_path.parent
 
-        # Extract dependency versions if available
+        from .verifier import CodeVerifier
+
+        verifier = CodeVerifier(project_root)
+        code = self._generate_declarations(blueprint, context_parts, language)
+        if code is not None:
+            results = verifier.verify_all(code, blueprint)
+            if all(result.success for result in results):
+                return code, results
+            self._forget_response(*self._declarations_request(blueprint, context_parts))
+            logger.debug(f"Declarations for {blueprint.module_name} failed verification, regenerating as code")
+
+        # Built after the declarations attempt: adaptive prompt building makes its
+        # own Claude call, which a verified declarations response makes unnecessary
         dependency_versions = {}
-        if main_md_path and main_md_path.exists():
+        if main_md_path:
             dependency_versions = self.extract_dependency_versions(main_md_path)
-
-        # Generate code once
-        code = self.generate_single_blueprint(
+        prompt = self._build_generation_prompt(
             blueprint, context_parts, language, dependency_versions
         )
 
-        # Simple verification (caller handles retries if needed)
-        verifier = CodeVerifier(project_root)
-        results = verifier.verify_all(code, blueprint)
+        candidates = max(1, max_retries) if self.temperature > 0 else 1
+        model = self.pick_model(blueprint)
+
+        code, results = None, []
+        if candidates == 1:
+            code = self._call_claude_api(prompt, model)
+            if on_candidate is not None:
+                on_candidate(code)
+            results = verifier.verify_all(code, blueprint)
+        elif default_config.race_candidates:
+            code, results = self._race_candidates(
+                prompt, model, candidates, verifier, blueprint, on_candidate, stop_on_success
+            )
+        else:
+            for attempt in range(candidates):
+                candidate = self._call_claude_api(prompt, model)
+                if attempt == 0 and on_candidate is not None:
+                    on_candidate(candidate)
+                candidate_results = verifier.verify_all(candidate, blueprint)
+                if code is None or self._count_failures(candidate_results) < self._count_failures(results):
+                    code, results = candidate, candidate_results
+                if stop_on_success and all(result.success for result in results):
+                    break
+                logger.debug(f"Candidate {attempt + 1}/{candidates} for {blueprint.module_name} failed verification")
 
         # Record result for adaptive prompt learning
         success = all(result.success for result in results)
+        if not success:
+            self._forget_response(prompt, model)
         verification_errors = [result.error_message for result in results if not result.success and result.error_message]
         self.prompt_builder.record_generation_result(blueprint, language, success, verification_errors)
 
         return code, results
 
+    def _build_generation_prompt(
+        self,
+        blueprint: Blueprint,
+        context_parts: List[str],
+        language: str,
+        dependency_versions: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Build the generation prompt for a blueprint."""
+        return self.prompt_builder.build_single_blueprint_prompt(
+            blueprint, language, context_parts, dependency_versions
+        )
+
+    def build_request(
+        self,
+        blueprint: Blueprint,
+        context_parts: List[str],
+        language: str,
+        dependency_versions: Optional[Dict[str, str]] = None,
+    ) -> Tuple[str, str]:
+        """Build the generation prompt for a blueprint and pick the model to send it to."""
+        prompt = self._build_generation_prompt(blueprint, context_parts, language, dependency_versions)
+        return prompt, self.pick_model(blueprint)
+
+    @staticmethod
+    def _count_failures(results: List) -> int:
+        """Count failed verification checks."""
+        return sum(1 for result in results if not result.success)
+
+    def _race_candidates(
+        self,
+        prompt: str,
+        model: str,
+        candidates: int,
+        verifier,
+        blueprint: Blueprint,
+        on_candidate: Optional[Callable[[str], None]] = None,
+        stop_on_success: bool = True,
+    ) -> Tuple[str, List]:
+        """Request candidates concurrently and keep the first that passes verification.
+
+        Once one passes (with stop_on_success), the remaining requests stop
+        streaming and give up their request slots instead of running to completion.
+        """
+        logger.debug(f"Racing {candidates} candidates for {blueprint.module_name}")
+        cancel = threading.Event()
+        code, results = None, []
+        executor = ThreadPoolExecutor(max_workers=candidates)
+        try:
+            futures = [
+                executor.submit(self._call_claude_api, prompt, model, cache=False, cancel=cancel)
+                for _ in range(candidates)
+            ]
+            verified = set()
+            for future in as_completed(futures):
+                try:
+                    candidate = future.result()
+                except Exception as e:
+                    logger.warning(f"Candidate generation failed: {e}")
+                    continue
+
+                if code is None and on_candidate is not None:
+                    on_candidate(candidate)
+                if candidate in verified:
+                    continue
+                verified.add(candidate)
+                candidate_results = verifier.verify_all(candidate, blueprint)
+                if code is None or self._count_failures(candidate_results) < self._count_failures(results):
+                    code, results = candidate, candidate_results
+                if stop_on_success and all(result.success for result in results):
+                    break
+        finally:
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if code is None:
+            raise RuntimeError(f"All {candidates} generation attempts failed for {blueprint.module_name}")
+        return code, results
+
     def create_blueprint_context(
         self,
         blueprint: Blueprint,
-        resolved: ResolvedBlueprint,
+        resolved: "ResolvedBlueprint",
         generated_context: Dict[str, str],
         language: str,
     ) -> List[str]:
@@ -133,22 +699,44 @@ class CodeGenerator:
             blueprint, resolved, generated_context, language
         )
 
-    def create_comprehensive_context(self, resolved: ResolvedBlueprint, language: str) -> List[str]:
+    def create_comprehensive_context(self, resolved: "ResolvedBlueprint", language: str) -> List[str]:
         """Create intelligently curated comprehensive context."""
         return self.context_builder.create_comprehensive_context(resolved, language)
 
     def extract_dependency_versions(self, main_md_path: Path) -> Dict[str, str]:
-        """Extract dependency names and versions from main.md."""
-        if not main_md_path or not main_md_path.exists():
+        """Extract dependency names and versions from main.md.
+
+        Results are reused while main.md is unchanged, since verification asks
+        for them once per blueprint.
+        """
+        if not main_md_path:
             return {}
 
-        dependency_versions = {}
-        content = main_md_path.read_text()
+        try:
+            stat = main_md_path.stat()
+        except FileNotFoundError:
+            return {}
 
+        key = (str(main_md_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._dependency_versions.get(key)
+        if cached is not None:
+            return dict(cached)
 
+        if stat.st_size < _MMAP_THRESHOLD:
+            versions = self._parse_dependency_versions(main_md_path.read_text().splitlines())
+        else:
+            with open(main_md_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                lines = (line.decode("utf-8") for line in iter(mm.readline, b""))
+                versions = self._parse_dependency_versions(lines)
+        self._dependency_versions[key] = versions
+        return dict(versions)
+
+    def _parse_dependency_versions(self, lines: Iterable[str]) -> Dict[str, str]:
+        """Parse dependency names and versions from main.md lines."""
+        dependency_versions = {}
         in_deps_section = False
 
-        for line in content.splitlines():
+        for line in lines:
             line = line.strip()
 
             # Check for dependency section headers
@@ -162,125 +750,324 @@ class CodeGenerator:
 
             # Parse dependency lines
             if in_deps_section and line.startswith("- "):
-                version_match = re.match(r"- ([a-zA-Z0-9\-_\[\]]+)([><=~!]+)?([0-9.]+)?", line)
-                if version_match and version_match.group(3):
-                    name = version_match.group(1).split("[")[0]
-                    version = version_match.group(3)
-                    operator = version_match.group(2) if version_match.group(2) else ">="
-                    dependency_versions[name] = f"{operator}{version}"
-                else:
-                    desc_match = re.match(r"- ([a-zA-Z0-9\-_\[\]]+)(\s*-.*)?", line)
-                    if desc_match:
-                        name = desc_match.group(1).split("[")[0]
-                        dependency_versions[name] = "latest"
+                match = _VERSION_RE.match(line)
+                if not match:
+                    continue
+                version = match.group("version")
+                dependency_versions[match.group("name")] = (
+                    f"{match.group('op') or '>='}{version}" if version else "latest"
+                )
 
         return dependency_versions
 
     def find_main_md_in_project(self, start_path: Path) -> Optional[Path]:
-        """Find main.md by walking up the directory tree from start_path."""
-        current_path = start_path.resolve()
-
-        while current_path != current_path.parent:
-            main_md = current_path / "main.md"
-            if main_md.exists():
-                return main_md
-            current_path = current_path.parent
+        """Find main.md by walking up the directory tree from start_path.
 
-        main_md = current_path / "main.md"
-        if main_md.exists():
+        A found main.md is remembered per start directory and reused while it
+        still exists; misses are not cached, so a newly created main.md is found.
+        """
+        start_path = start_path.resolve()
+        main_md = self._main_md_paths.get(start_path)
+        if main_md is not None and main_md.exists():
             return main_md
 
+        for directory in (start_path, *start_path.parents):
+            main_md = directory / "main.md"
+            if main_md.exists():
+                self._main_md_paths[start_path] = main_md
+                return main_md
         return None
 
-    def determine_output_path(self, blueprint: Blueprint, output_dir: Path, language: str) -> Path:
-        """Determine the output file path for a blueprint."""
+    def determine_output_path(
+        self, blueprint: Blueprint, output_dir: Path, language: str, create_dirs: bool = True
+    ) -> Path:
+        """Determine the output file path for a blueprint; create_dirs=False only computes it."""
+        extension = get_file_extension(language)
         if blueprint.file_path:
-            blueprint_dir = blueprint.file_path.parent
-            filename = f"{blueprint.file_path.stem}{self._get_file_extension(language)}"
-            return blueprint_dir / filename
+            return blueprint.file_path.parent / f"{blueprint.file_path.stem}{extension}"
 
         module_parts = blueprint.module_name.split(".")
-        filename = f"{module_parts[-1]}{self._get_file_extension(language)}"
+        filename = f"{module_parts[-1]}{extension}"
 
         if len(module_parts) > 1:
-            file_dir = output_dir / Path(*module_parts[:-1])
-            file_dir.mkdir(parents=True, exist_ok=True)
+            file_dir = output_dir.joinpath(*module_parts[:-1])
+            if create_dirs and file_dir not in self._output_dirs:
+                file_dir.mkdir(parents=True, exist_ok=True)
+                self._output_dirs.add(file_dir)
             return file_dir / filename
 
         return output_dir / filename
 
     def save_generated_code(self, code: str, output_path: Path, force: bool) -> None:
         """Save generated code to file with force flag handling."""
-        if output_path.exists() and not force:
+        if force and file_has_text(output_path, code):
+            logger.debug(f"Unchanged, not rewriting: {output_path}")
+            return
+        # Exclusive create checks and creates in one syscall, avoiding the exists() race
+        mode = "w" if force else "x"
+        try:
+            with open(output_path, mode, encoding="utf-8") as f:
+                f.write(code)
+        except FileExistsError:
             raise RuntimeError(
                 f"File {output_path} already exists. Use --force to overwrite."
             )
 
-        output_path.write_text(code)
+    def _call_claude_api(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        cache: bool = True,
+        cancel: Optional[threading.Event] = None,
+    ) -> str:
+        """Make API call to Claude and extract clean code.
 
-    def _call_claude_api(self, prompt: str) -> str:
-        """Make API call to Claude and extract clean code."""
-        logger = get_logger('generator')
-        
+        cache=False always makes a fresh request, bypassing the response cache
+        and coalescing with identical in-flight requests. Setting cancel stops
+        an uncached request before it starts or while it streams.
+        """
+        model = model or self.model
+        max_tokens = max_tokens or self.max_tokens
         # Validate API key is available
         if not self.api_key:
             logger.error("No API key available for Claude API call")
             raise RuntimeError("No API key provided for code generation")
         
         try:
-            logger.debug(f"Making API call to {self.model} (prompt: {len(prompt)} chars)")
+            logger.debug(f"Making API call to {model} (prompt: {len(prompt)} chars)")
             logger.debug(f"Using API key: {'*' * (len(self.api_key) - 8) + self.api_key[-8:] if len(self.api_key) > 8 else '***'}")
             
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                messages=[{"role": "user", "content": prompt}],
-            )
+            if cache:
+                response_text = self._cached_response_text(prompt, model, max_tokens)
+            else:
+                response_text = self._stream_response_text(prompt, model, max_tokens, cancel)
             
-            logger.debug(f"Received response ({len(response.content[0].text)} chars)")
-            code = self._extract_code_from_response(response.content[0].text)
+            logger.debug(f"Received response ({len(response_text)} chars)")
+            code = self._extract_code_from_response(response_text)
             logger.info(f"Successfully generated {len(code)} characters of code")
             return code
             
         except Exception as e:
+            if cancel is not None and cancel.is_set():
+                raise
             logger.error(f"API call failed: {type(e).__name__}: {str(e)}")
             if "api_key" in str(e).lower() or "unauthorized" in str(e).lower():
                 logger.error("This appears to be an API key issue. Please check your ANTHROPIC_API_KEY.")
             raise RuntimeError(f"Failed to generate code: {str(e)}")
 
+    def _cached_response_text(self, prompt: str, model: str, max_tokens: int) -> str:
+        """Return Claude's response text, reusing a cached one for identical requests.
+
+        Only deterministic (temperature 0) requests are cached; identical ones
+        issued concurrently wait for the first instead of calling the API again.
+        """
+        if not self._caches_responses():
+            return self._stream_response_text(prompt, model, max_tokens)
+
+        key = self._response_cache_key(prompt, model, max_tokens)
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            is_owner = pending is None
+            if is_owner:
+                pending = self._inflight[key] = Future()
+        if not is_owner:
+            logger.debug("Waiting for an identical in-flight request")
+            return pending.result()
+
+        try:
+            response_text = self._read_or_fetch_response(prompt, model, max_tokens, key)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(response_text)
+            return response_text
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _response_cache_key(self, prompt: str, model: str, max_tokens: int) -> str:
+        """Hash everything that determines a response into its cache key."""
+        return hashlib.sha256(json.dumps({
+            "v": _RESPONSE_CACHE_VERSION,
+            "m": model,
+            "t": self.temperature,
+            "mx": max_tokens,
+            "p": prompt,
+        }, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _forget_response(self, prompt: str, model: str, max_tokens: Optional[int] = None) -> None:
+        """Drop a cached response, e.g. one whose code failed verification, so a re-run asks again."""
+        if not self._caches_responses():
+            return
+        key = self._response_cache_key(prompt, model, max_tokens or self.max_tokens)
+        try:
+            (self.cache_dir / f"{key}.txt").unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.debug(f"Could not remove response cache entry: {e}")
+
+    def _read_or_fetch_response(self, prompt: str, model: str, max_tokens: int, key: str) -> str:
+        """Read a response from the on-disk cache, or fetch and store it."""
+        cache_path = self.cache_dir / f"{key}.txt"
+        response_text = self._read_cache_entry(cache_path)
+        if response_text is not None:
+            return response_text
+
+        response_text = self._stream_response_text(prompt, model, max_tokens)
+        try:
+            self.write_text_atomic(cache_path, response_text)
+        except OSError as e:
+            logger.debug(f"Could not write response cache entry: {e}")
+        return response_text
+
+    @staticmethod
+    def _read_cache_entry(cache_path: Path) -> Optional[str]:
+        """Read a cache entry, or None if it is missing or older than the cache TTL."""
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                ttl = default_config.response_cache_ttl
+                if ttl <= 0 or time.time() - os.fstat(f.fileno()).st_mtime < ttl:
+                    logger.debug(f"Using cached response: {cache_path.name}")
+                    return f.read()
+                logger.debug(f"Cached response expired: {cache_path.name}")
+        except FileNotFoundError:
+            pass
+        return None
+
+    @staticmethod
+    def write_text_atomic(path: Path, text: str) -> None:
+        """Write text to a temporary file beside path, then rename it into place."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp.write(text)
+        os.replace(tmp.name, path)
+
+    def _stream_response_text(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        cancel: Optional[threading.Event] = None,
+    ) -> str:
+        """Stream a completion, retrying transient failures with jittered exponential backoff."""
+        max_attempts = max(1, default_config.api_max_attempts)
+        for attempt in range(max_attempts):
+            _raise_if_cancelled(cancel)
+            # Rough input-token estimate; Anthropic meters input and output tokens separately
+            _rate_limiter.acquire(len(prompt) // 4)
+            try:
+                with _request_slots:
+                    return self._stream_response_once(prompt, model, max_tokens, cancel)
+            except Exception as e:
+                if attempt + 1 == max_attempts or not _is_retryable(e):
+                    raise
+                delay = _retry_delay(e, attempt)
+                logger.warning(
+                    f"Transient API error ({type(e).__name__}), retrying in {delay:.1f}s "
+                    f"(attempt {attempt + 2}/{max_attempts})"
+                )
+                time.sleep(delay)
+
+    def _stream_response_once(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        cancel: Optional[threading.Event] = None,
+    ) -> str:
+        """Stream a completion from Claude and return the accumulated text.
+
+        Leaving the stream early when cancel is set closes its connection.
+        """
+        _raise_if_cancelled(cancel)
+        chunks = []
+        with self.client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=self.temperature,
+            messages=[{"role": "user", "content": _build_message_content(prompt)}],
+            timeout=self._stream_timeout,
+        ) as stream:
+            for text in stream.text_stream:
+                if cancel is not None and cancel.is_set():
+                    break
+                chunks.append(text)
+            else:
+                _warn_if_truncated(stream.get_final_message().stop_reason, max_tokens)
+        _raise_if_cancelled(cancel)
+        return "".join(chunks)
+
+    def supports_message_batches(self) -> bool:
+        """Check whether the installed Anthropic SDK exposes the Message Batches API."""
+        return hasattr(self.client.messages, "batches")
+
+    def generate_batch(
+        self, prompts: Dict[str, str], models: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """Generate code for several independent prompts through one message batch.
+
+        Prompts (and optional per-prompt models) are keyed by caller-chosen ids;
+        the returned code uses the same keys. Requests the batch could not
+        complete are retried individually, and a single prompt skips the batch
+        queue entirely.
+        """
+        if not prompts:
+            return {}
+        models = models or {}
+        if len(prompts) == 1:
+            (key, prompt), = prompts.items()
+            return {key: self._call_claude_api(prompt, models.get(key))}
+        # Batch management calls are cheap to repeat, so they keep the SDK's own retries
+        batches = self.client.with_options(max_retries=2).messages.batches
+
+        # Batch custom_ids only allow [a-zA-Z0-9_-], so module names are mapped to indices
+        keys = list(prompts)
+        batch = batches.create(requests=[
+            {
+                "custom_id": f"req-{i}",
+                "params": {
+                    "model": models.get(key, self.model),
+                    "max_tokens": self.max_tokens,
+                    "temperature": self.temperature,
+                    "messages": [{"role": "user", "content": _build_message_content(prompts[key])}],
+                },
+            }
+            for i, key in enumerate(keys)
+        ])
+        logger.info(f"Submitted message batch {batch.id} ({len(keys)} requests)")
+
+        poll_seconds = _BATCH_POLL_SECONDS
+        while batch.processing_status != "ended":
+            time.sleep(poll_seconds)
+            poll_seconds = min(poll_seconds * 2, _BATCH_MAX_POLL_SECONDS)
+            batch = batches.retrieve(batch.id)
+        logger.debug(f"Message batch {batch.id} ended: {batch.request_counts}")
+
+        results = {}
+        for entry in batches.results(batch.id):
+            key = keys[int(entry.custom_id[len("req-"):])]
+            if entry.result.type != "succeeded":
+                logger.warning(f"Batch request for {key} {entry.result.type}; retrying individually")
+                continue
+            _warn_if_truncated(entry.result.message.stop_reason, self.max_tokens)
+            response_text = "".join(
+                block.text for block in entry.result.message.content if block.type == "text"
+            )
+            results[key] = self._extract_code_from_response(response_text)
+
+        for key in keys:
+            if key not in results:
+                results[key] = self._call_claude_api(prompts[key], models.get(key))
+        return results
+
     def _extract_code_from_response(self, response: str) -> str:
         """Extract clean code from Claude's response."""
-        lines = response.strip().split("\n")
-
-        if lines[0].startswith("```"):
-            code_lines = []
-            in_code_block = False
-            for line in lines:
-                if line.startswith("```") and not in_code_block:
-                    in_code_block = True
-                    continue
-                elif line.startswith("```") and in_code_block:
-                    break
-                elif in_code_block:
-                    code_lines.append(line)
-            return "\n".join(code_lines)
-
-        return response.strip()
-
-    def _get_file_extension(self, language: str) -> str:
-        """Get the appropriate file extension for the language."""
-        extensions = {
-            "python": ".py",
-            "javascript": ".js",
-            "typescript": ".ts",
-            "java": ".java",
-            "go": ".go",
-            "rust": ".rs",
-            "cpp": ".cpp",
-            "c": ".c",
-        }
-        return extensions.get(language.lower(), ".txt")
+        return extract_fenced_code(response)
 
 
 class NaturalCodeGenerator(CodeGenerator):
@@ -305,4 +1092,20 @@ class NaturalCodeGenerator(CodeGenerator):
                 blueprint, context_parts, language, dependency_versions
             )
 
+    def _build_generation_prompt(
+        self,
+        blueprint: Blueprint,
+        context_parts: List[str],
+        language: str,
+        dependency_versions: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Use the natural prompt for natural language blueprints."""
+        is_natural = bool(blueprint.requirements or blueprint.sections or blueprint.dependencies)
 
+        if is_natural:
+            return self.prompt_builder.build_natural_blueprint_prompt(
+                blueprint, language, context_parts, dependency_versions
+            )
+        return super()._build_generation_prompt(
+            blueprint, context_parts, language, dependency_versions
+        )
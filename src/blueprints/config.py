@@ -6,7 +6,14 @@ from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
-from .constants import DEFAULT_MODEL, DEFAULT_MAX_TOKENS
+from .constants import (
+    DEFAULT_API_MAX_ATTEMPTS,
+    DEFAULT_LIGHT_MODEL,
+    DEFAULT_LIGHT_MODEL_MAX_METHODS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_TOKENS,
+    DEFAULT_MODEL,
+)
 
 
 class BlueprintsConfig(BaseSettings):
@@ -15,11 +22,28 @@ class BlueprintsConfig(BaseSettings):
     # API Configuration
     anthropic_api_key: Optional[str] = Field(default=None, env="ANTHROPIC_API_KEY")
     default_model: str = Field(DEFAULT_MODEL, env="BLUEPRINTS_MODEL")
+    # Opt-in model for simple structured blueprints; empty disables the routing
+    light_model: str = Field(DEFAULT_LIGHT_MODEL, env="BLUEPRINTS_LIGHT_MODEL")
+    light_model_max_methods: int = Field(
+        DEFAULT_LIGHT_MODEL_MAX_METHODS, env="BLUEPRINTS_LIGHT_MODEL_MAX_METHODS"
+    )
 
     # Generation Settings
     default_language: str = Field("python", env="BLUEPRINTS_LANGUAGE")
     max_tokens: int = Field(DEFAULT_MAX_TOKENS, env="BLUEPRINTS_MAX_TOKENS")
     temperature: float = Field(0.0, env="BLUEPRINTS_TEMPERATURE")
+    # Request verification candidates concurrently instead of one at a time;
+    # extra candidates are only requested when temperature > 0
+    race_candidates: bool = Field(False, env="BLUEPRINTS_RACE_CANDIDATES")
+    api_max_attempts: int = Field(DEFAULT_API_MAX_ATTEMPTS, env="BLUEPRINTS_API_MAX_ATTEMPTS")
+    max_concurrent_requests: int = Field(
+        DEFAULT_MAX_CONCURRENT_REQUESTS, env="BLUEPRINTS_MAX_CONCURRENT_REQUESTS"
+    )
+    # Seconds a cached Claude response stays valid; 0 keeps entries forever
+    response_cache_ttl: int = Field(0, env="BLUEPRINTS_RESPONSE_CACHE_TTL")
+    # Client-side API rate limits (estimated input tokens); 0 disables a limit
+    requests_per_minute: int = Field(0, env="BLUEPRINTS_REQUESTS_PER_MINUTE")
+    tokens_per_minute: int = Field(0, env="BLUEPRINTS_TOKENS_PER_MINUTE")
 
     # File Settings
     blueprint_extensions: list[str] = Field(default_factory=lambda: [".md"])
@@ -4,6 +4,19 @@
 DEFAULT_MODEL = "claude-sonnet-4-20250514"
 DEFAULT_MAX_TOKENS = 4000
 
+# Cheaper model for simple structured blueprints (few methods, no inheritance);
+# empty leaves every blueprint on the main model unless BLUEPRINTS_LIGHT_MODEL is set
+DEFAULT_LIGHT_MODEL = ""
+DEFAULT_LIGHT_MODEL_MAX_METHODS = 3
+
+# Attempts per generation request on rate limits, overloads and connection errors
+DEFAULT_API_MAX_ATTEMPTS = 5
+# Generation requests allowed in flight at once across all worker threads
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+
+# Closes the curated dependency context that prefixes generation prompts
+CURATED_CONTEXT_END = "=== END CURATED CONTEXT ===\n"
+
 # Error Messages
 API_KEY_ERROR_TEMPLATE = (
     "ANTHROPIC_API_KEY environment variable is required for {purpose}. "
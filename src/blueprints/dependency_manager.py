@@ -1,12 +1,27 @@
 from dataclasses import dataclass
-from enum import Enum, auto
+from enum import IntEnum, auto
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 import os
 import re
 import sys
 
 
+# Dependency list entry in main.md after its "- " marker, e.g.
+# "fastapi>=0.104.0  # Web framework"; extras like "[standard]" are skipped
+_DEP_BODY_RE = re.compile(
+    r"\s*([a-zA-Z0-9_.-]+)(?:\[[^\]]*\])?(?:[><=!]+([0-9.]+[a-zA-Z0-9.]*))?"
+)
+
+# Stdlib modules named per build (e.g. _sysconfigdata__linux_x86_64-linux-gnu)
+# that sys.stdlib_module_names does not list
+_GENERATED_STDLIB_PREFIXES = ("_sysconfigdata_", "_bootsubprocess")
+
+# Every mock module gets the same pre-encoded placeholder source
+_MOCK_MODULE_SOURCE = b"# Mock module\n"
+_MOCK_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+
+
 @dataclass
 class DependencyInfo:
     """Information about a code dependency."""
@@ -19,7 +34,7 @@ class DependencyInfo:
     is_expected: bool = False  # Known from main.md dependencies
 
 
-class ImportCategory(Enum):
+class ImportCategory(IntEnum):
     """Categories for import statements."""
 
     STANDARD_LIBRARY = auto()
@@ -43,6 +58,12 @@ class DependencyManager:
         self.project_root = project_root
         self.expected_dependencies: Dict[str, DependencyInfo] = {}
         self.stdlib_modules = self._get_stdlib_modules()
+        # Union of stdlib and expected names, refreshed with expected_dependencies
+        self._known_modules: FrozenSet[str] = self.stdlib_modules
+        # import name -> whether it exists under project_root
+        self._local_cache: Dict[str, bool] = {}
+        # ((path, mtime_ns, size), parsed dependencies) of the last main.md read
+        self._md_cache: Optional[Tuple[Tuple[Path, int, int], Dict[str, DependencyInfo]]] = None
 
     def parse_project_dependencies(
         self, main_md_path: Optional[Path] = None
@@ -50,53 +71,86 @@ class DependencyManager:
         if main_md_path is None:
             main_md_path = self.project_root / "main.md"
 
-        if not main_md_path.exists():
+        try:
+            stat = main_md_path.stat()
+        except FileNotFoundError:
+            self._md_cache = None
             return {}
 
-        content = main_md_path.read_text()
-        deps = self._extract_dependencies_from_main_md(content)
-        self.expected_dependencies = {d.name: d for d in deps}
+        # Skip re-reading and re-parsing a main.md that has not changed
+        cache_key = (main_md_path, stat.st_mtime_ns, stat.st_size)
+        if self._md_cache is not None and self._md_cache[0] == cache_key:
+            self._set_expected_dependencies(self._md_cache[1])
+            return self.expected_dependencies
+
+        with main_md_path.open("r", encoding="utf-8") as lines:
+            deps = self._extract_dependencies_from_main_md(lines)
+        self._set_expected_dependencies({d.name: d for d in deps})
+        self._md_cache = (cache_key, self.expected_dependencies)
         return self.expected_dependencies
 
+    def _set_expected_dependencies(self, deps: Dict[str, DependencyInfo]) -> None:
+        self.expected_dependencies = deps
+        # frozenset.union keeps the frozenset type; `| deps.keys()` would yield a set
+        self._known_modules = self.stdlib_modules.union(deps)
+
     def categorize_import(self, import_name: str) -> ImportCategory:
-        if self.is_standard_library(import_name):
-            return ImportCategory.STANDARD_LIBRARY
-        elif import_name in self.expected_dependencies:
+        # One lookup settles the common case of a stdlib or declared import
+        if import_name in self._known_modules:
+            if import_name in self.stdlib_modules:
+                return ImportCategory.STANDARD_LIBRARY
             return ImportCategory.THIRD_PARTY
-        elif (self.project_root / import_name.replace(".", "/")).exists():
+        elif import_name.startswith(_GENERATED_STDLIB_PREFIXES):
+            return ImportCategory.STANDARD_LIBRARY
+        elif self._is_local_module(import_name):
             return ImportCategory.LOCAL
         return ImportCategory.UNKNOWN
 
+    def _is_local_module(self, import_name: str) -> bool:
+        is_local = self._local_cache.get(import_name)
+        if is_local is None:
+            is_local = (self.project_root / import_name.replace(".", "/")).exists()
+            self._local_cache[import_name] = is_local
+        return is_local
+
     def is_standard_library(self, module_name: str) -> bool:
-        return module_name in self.stdlib_modules
+        return module_name in self.stdlib_modules or module_name.startswith(
+            _GENERATED_STDLIB_PREFIXES
+        )
 
     def is_expected_dependency(self, import_name: str) -> bool:
         return import_name in self.expected_dependencies
 
     def create_mock_module(self, module_name: str, temp_dir: Path) -> Path:
         mock_path = temp_dir / f"{module_name}.py"
-        mock_path.write_text(f"# Mock module for {module_name}")
+        fd = os.open(mock_path, _MOCK_OPEN_FLAGS, 0o644)
+        try:
+            os.write(fd, _MOCK_MODULE_SOURCE)
+        finally:
+            os.close(fd)
         return mock_path
 
     def setup_verification_environment(
         self, imports: List[str], temp_dir: Path
     ) -> Dict[str, Path]:
-        mocks = {}
-        for imp in imports:
-            if not self.is_standard_library(imp) and not self.is_expected_dependency(
-                imp
-            ):
-                mock_path = self.create_mock_module(imp, temp_dir)
-                mocks[imp] = mock_path
-        return mocks
-
-    def _extract_dependencies_from_main_md(self, content: str) -> List[DependencyInfo]:
+        to_mock = set(imports) - self._known_modules
+        return {
+            imp: self.create_mock_module(imp, temp_dir)
+            for imp in to_mock
+            if not imp.startswith(_GENERATED_STDLIB_PREFIXES)
+        }
+
+    def _extract_dependencies_from_main_md(
+        self, lines: Iterable[str]
+    ) -> List[DependencyInfo]:
         deps = []
         in_third_party = False
         in_dev_deps = False
 
-        for line in content.splitlines():
-            line = line.strip()
+        for line in lines:
+            # Only leading whitespace affects the checks below
+            if line[:1].isspace():
+                line = line.lstrip()
 
             if "## Third-party Dependencies" in line:
                 in_third_party = True
@@ -112,29 +166,21 @@ class DependencyManager:
                 continue
 
             if (in_third_party or in_dev_deps) and line.startswith("- "):
-                if dep := self._parse_dependency_line(line):
+                if dep := self._parse_dep_body(line[2:]):
                     deps.append(dep)
         return deps
 
-    def _get_stdlib_modules(self) -> Set[str]:
-        stdlib_modules = set(sys.stdlib_module_names)
-        return stdlib_modules
-
-    def _parse_dependency_line(self, line: str) -> Optional[DependencyInfo]:
-        line = line.strip()
-        if not line or line.startswith("#"):
-            return None
+    def _get_stdlib_modules(self) -> FrozenSet[str]:
+        # Already a frozenset shared by the interpreter; no need to copy it
+        return sys.stdlib_module_names
 
-        # Parse format like: "- fastapi>=0.104.0  # Web framework"
-        match = re.match(
-            r"-\s+([a-zA-Z0-9_.-]+)(?:[><=!]+([0-9.]+[a-zA-Z0-9.]*))?\s*(?:#.*)?", line
-        )
+    def _parse_dep_body(self, body: str) -> Optional[DependencyInfo]:
+        # Caller has already matched and stripped the leading "- "
+        match = _DEP_BODY_RE.match(body)
         if match:
             name, version = match.groups()
-            # Handle package names with extras like "uvicorn[standard]"
-            base_name = name.split("[")[0]
             return DependencyInfo(
-                name=base_name, version=version, is_third_party=True, is_expected=True
+                name=sys.intern(name), version=version, is_third_party=True, is_expected=True
             )
         return None
 
@@ -1,5 +1,6 @@
 """Factory functions for creating configured code generators."""
 
+from pathlib import Path
 from typing import Optional
 
 from .generator import CodeGenerator
@@ -10,7 +11,9 @@ from .logging_config import get_logger
 def create_quality_enhanced_generator(api_key: Optional[str] = None, 
                                      model: Optional[str] = None,
                                      enable_quality_improvement: bool = True,
-                                     max_quality_iterations: int = 2) -> CodeGenerator:
+                                     max_quality_iterations: int = 2,
+                                     cache_dir: Optional[Path] = None,
+                                     use_cache: bool = True) -> CodeGenerator:
     """Create a code generator with optional iterative quality improvement.
     
     Args:
@@ -18,6 +21,8 @@ def create_quality_enhanced_generator(api_key: Optional[str] = None,
         model: Model to use
         enable_quality_improvement: Whether to enable iterative improvement
         max_quality_iterations: Maximum quality improvement iterations
+        cache_dir: Directory for cached Claude responses (default: ~/.cache/blueprints)
+        use_cache: Whether to reuse cached responses for identical requests
     
     Returns:
         CodeGenerator instance, optionally wrapped with quality improvement
@@ -29,7 +34,7 @@ def create_quality_enhanced_generator(api_key: Optional[str] = None,
     
     # Create a base generator instance using the compatibility wrapper
     logger.debug("Creating base CodeGenerator...")
-    base_generator = CodeGenerator(api_key, model)
+    base_generator = CodeGenerator(api_key, model, cache_dir=cache_dir, use_cache=use_cache)
     logger.debug("Base generator created successfully")
     
     if enable_quality_improvement:
@@ -9,9 +9,11 @@ from typing import Optional, Dict, List, Tuple
 from .logging_config import get_logger
 from .parser import Blueprint
 from .resolver import ResolvedBlueprint
-from .code_generator import CodeGenerator as CoreCodeGenerator
+from .code_generator import CodeGenerator as CoreCodeGenerator, get_file_extension
 from .project_generator import ProjectGenerator
 
+logger = get_logger('generator')
+
 
 class CodeGenerator:
     """Main code generator interface that delegates to focused modules.
@@ -19,13 +21,20 @@ class CodeGenerator:
     This class maintains backward compatibility while using the new architecture.
     """
 
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        cache_dir: Optional[Path] = None,
+        use_cache: bool = True,
+    ):
         """Initialize the code generator with focused modules."""
-        logger = get_logger('generator')
         logger.debug(f"Initializing CodeGenerator wrapper (api_key: {'provided' if api_key else 'none'}, model: {model or 'default'})")
         
         logger.debug("Creating core generator...")
-        self.core_generator = CoreCodeGenerator(api_key=api_key, model=model)
+        self.core_generator = CoreCodeGenerator(
+            api_key=api_key, model=model, cache_dir=cache_dir, use_cache=use_cache
+        )
         logger.debug("Core generator created")
         
         logger.debug("Creating project generator...")
@@ -34,6 +43,12 @@ class CodeGenerator:
         
         logger.debug("CodeGenerator wrapper initialization complete")
 
+    def __getattr__(self, name: str):
+        """Forward attributes not defined here to the core generator."""
+        if name == "core_generator":
+            raise AttributeError(name)
+        return getattr(self.core_generator, name)
+
     def _format_component_for_prompt(self, component):
         """Delegate to prompt builder for component formatting."""
         return self.core_generator.prompt_builder._format_component_for_prompt(component)
@@ -52,7 +67,6 @@ class CodeGenerator:
         verify: bool = True,
     ) -> Dict[str, Path]:
         """Generate code for all blueprints in dependency order."""
-        logger = get_logger('generator')
         logger.debug(f"Starting project generation: {len(resolved.generation_order)} blueprints")
         logger.debug(f"Output dir: {output_dir}, Language: {language}, Force: {force}, Verify: {verify}")
         
@@ -63,7 +77,20 @@ class CodeGenerator:
         logger.debug(f"Project generation completed: {len(result)} files generated")
         return result
 
-    # Backward compatibility properties
+    def generate_project_batched(
+        self,
+        resolved: ResolvedBlueprint,
+        output_dir: Path,
+        language: str = "python",
+        force: bool = False,
+        main_md_path: Optional[Path] = None,
+    ) -> Dict[str, Path]:
+        """Generate all blueprints through the Message Batches API."""
+        return self.project_generator.generate_project_batched(
+            resolved, output_dir, language, force, main_md_path
+        )
+
+    # Backward compatibility properties (deprecated; use core_generator)
     @property
     def api_key(self):
         """Access to API key for backward compatibility."""
@@ -96,10 +123,11 @@ class CodeGenerator:
         language: str = "python",
         force: bool = False,
         verify: bool = True,
+        main_md_path: Optional[Path] = None,
     ) -> Path:
         """Generate a single file with all dependencies as context."""
         return self.project_generator.generate_single_with_context(
-            resolved, output_path, language, force, verify
+            resolved, output_path, language, force, verify, main_md_path
         )
 
     def _create_single_blueprint_prompt(
@@ -128,7 +156,7 @@ class CodeGenerator:
 
     def _get_file_extension(self, language: str) -> str:
         """Get the appropriate file extension for the language."""
-        return self.core_generator._get_file_extension(language)
+        return get_file_extension(language)
 
     def _extract_dependency_versions(self, main_md_path: Path) -> Dict[str, str]:
         """Extract dependency names and versions from main.md."""
@@ -150,7 +178,6 @@ class CodeGenerator:
         """Find main.md by walking up the directory tree from start_path."""
         return self.core_generator.find_main_md_in_project(start_path)
 
-
     def generate_with_verification(
         self,
         blueprint: Blueprint,
@@ -1,15 +1,95 @@
 """Intelligent context curation using Claude for relevance analysis and optimization."""
 
+import ast
+import hashlib
 import json
+import re
+from itertools import islice
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
-from anthropic import Anthropic
-
 from .parser import Blueprint
-from .constants import DEFAULT_MODEL
-from .utils import check_anthropic_api_key
+from .constants import CURATED_CONTEXT_END, DEFAULT_MODEL
+from .utils import check_anthropic_api_key, create_anthropic_client
+
+
+# Constant values longer than this are left out of generated-code summaries
+_MAX_SUMMARY_VALUE_CHARS = 80
+
+# Unindented declaration heads in non-Python code, cut before any body or initializer
+_DECLARATION_RE = re.compile(
+    r"^(?:export\s+)?(?:default\s+)?(?:pub\s+|public\s+)?(?:async\s+)?"
+    r"(?:function|class|interface|type|enum|struct|trait|fn|func|const)\b[^{\n;=]*",
+    re.MULTILINE,
+)
+
+
+def _summarize_signature(node: ast.AST, indent: str = "") -> List[str]:
+    """Render a function's decorators and signature without its body."""
+    lines = [f"{indent}@{ast.unparse(decorator)}" for decorator in node.decorator_list]
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    lines.append(f"{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}: ...")
+    return lines
+
+
+def _summarize_assignment(node: ast.AST, indent: str = "") -> Optional[str]:
+    """Render a module or class level assignment, dropping long values."""
+    if isinstance(node, ast.AnnAssign):
+        target = f"{ast.unparse(node.target)}: {ast.unparse(node.annotation)}"
+    else:
+        target = " = ".join(ast.unparse(t) for t in node.targets)
+    if node.value is None:
+        return f"{indent}{target}"
+    value = ast.unparse(node.value)
+    if len(value) > _MAX_SUMMARY_VALUE_CHARS:
+        return f"{indent}{target} = ..."
+    return f"{indent}{target} = {value}"
+
+
+def _is_public(name: str) -> bool:
+    """Whether a name belongs in an API summary (public names and dunders)."""
+    return not name.startswith("_") or (name.startswith("__") and name.endswith("__"))
+
+
+def summarize_generated_code(code: str) -> str:
+    """Reduce generated code to its public API without function bodies.
+
+    Python is summarized from its AST; other languages keep their top-level
+    declaration lines, or are returned unchanged if none are recognized.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        declarations = [match.rstrip() for match in _DECLARATION_RE.findall(code)]
+        return "\n".join(declarations) if declarations else code
+
+    lines = []
+    docstring = ast.get_docstring(tree)
+    if docstring:
+        lines.append(f'"""{docstring.splitlines()[0]}"""')
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if _is_public(node.name):
+                lines.extend(_summarize_signature(node))
+        elif isinstance(node, ast.ClassDef):
+            if not _is_public(node.name):
+                continue
+            lines.extend(f"@{ast.unparse(decorator)}" for decorator in node.decorator_list)
+            bases = ", ".join(ast.unparse(base) for base in node.bases)
+            lines.append(f"class {node.name}({bases}):" if bases else f"class {node.name}:")
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    if _is_public(item.name):
+                        lines.extend(_summarize_signature(item, "    "))
+                elif isinstance(item, (ast.Assign, ast.AnnAssign)):
+                    lines.append(_summarize_assignment(item, "    "))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            lines.append(_summarize_assignment(node))
+
+    return "\n".join(lines)
 
 
 @dataclass
@@ -146,6 +226,13 @@ Return ONLY the JSON.
 class ContextOptimizer:
     """Optimizes context size and ordering for maximum effectiveness."""
     
+    # (priority, section title, max content chars) in output order
+    _ORDERING_GROUPS = (
+        ("critical", "--- CRITICAL DEPENDENCIES ---", None),
+        ("high", "--- HIGH PRIORITY CONTEXT ---", None),
+        ("medium", "--- SUPPORTING CONTEXT ---", 500),
+    )
+
     def __init__(self, client):
         self.client = client
     
@@ -206,58 +293,36 @@ Context curation applied:
     def _create_optimal_ordering(self, selected_items: List[ContextItem], 
                                 blueprint: Optional[Blueprint]) -> List[str]:
         """Create optimally ordered context from selected items."""
-        context_parts = []
-        
-        # Group by priority and type
-        critical_items = [item for item in selected_items if item.priority == "critical"]
-        high_items = [item for item in selected_items if item.priority == "high"] 
-        medium_items = [item for item in selected_items if item.priority == "medium"]
-        low_items = [item for item in selected_items if item.priority == "low"]
-        
-        if selected_items:
-            context_parts.extend([
-                "=== CURATED CONTEXT ===",
-                "The following context has been intelligently selected for relevance:",
-                ""
-            ])
-            
-            # Add critical context first
-            if critical_items:
-                context_parts.append("--- CRITICAL DEPENDENCIES ---")
-                for item in critical_items:
-                    context_parts.extend([
-                        f"Module: {item.module_name} (Priority: {item.priority}, Relevance: {item.relevance_score:.1f})",
-                        item.content,
-                        ""
-                    ])
-            
-            # Add high priority context
-            if high_items:
-                context_parts.append("--- HIGH PRIORITY CONTEXT ---")
-                for item in high_items:
-                    context_parts.extend([
-                        f"Module: {item.module_name} (Priority: {item.priority}, Relevance: {item.relevance_score:.1f})", 
-                        item.content,
-                        ""
-                    ])
-            
-            # Add medium priority context (condensed)
-            if medium_items:
-                context_parts.append("--- SUPPORTING CONTEXT ---")
-                for item in medium_items:
-                    # Condense medium priority items
-                    condensed = item.content[:500] + ("..." if len(item.content) > 500 else "")
-                    context_parts.extend([
-                        f"Module: {item.module_name} (Priority: {item.priority}, Relevance: {item.relevance_score:.1f})",
-                        condensed,
-                        ""
-                    ])
-            
-            context_parts.extend([
-                "=== END CURATED CONTEXT ===",
-                ""
-            ])
-        
+        if not selected_items:
+            return []
+
+        context_parts = [
+            "=== CURATED CONTEXT ===",
+            "The following context has been intelligently selected for relevance:",
+            "",
+        ]
+
+        # Critical and high priority items are included verbatim, medium ones condensed.
+        # Items are ordered by module name and carry no per-call relevance score, so
+        # siblings sharing dependencies get a byte-identical, prompt-cacheable prefix.
+        for priority, title, limit in self._ORDERING_GROUPS:
+            items = sorted(
+                (item for item in selected_items if item.priority == priority),
+                key=lambda item: item.module_name,
+            )
+            if not items:
+                continue
+
+            context_parts.append(title)
+            for item in items:
+                content = item.content
+                if limit is not None and len(content) > limit:
+                    content = content[:limit] + "..."
+                context_parts.append(
+                    f"Module: {item.module_name} (Priority: {item.priority})\n{content}\n"
+                )
+
+        context_parts.append(CURATED_CONTEXT_END)
         return context_parts
 
 
@@ -268,11 +333,15 @@ class IntelligentContextCurator:
         check_anthropic_api_key("intelligent context curation")
         
         
-        self.client = Anthropic()
+        self.client = create_anthropic_client()
         
         self.max_tokens = max_tokens
         self.relevance_analyzer = ContextRelevanceAnalyzer(self.client)
         self.context_optimizer = ContextOptimizer(self.client)
+        # module name -> (sha256 of its generated code, context block); every later
+        # blueprint in a project receives the same modules again, and one entry
+        # per module keeps the cache as small as the project
+        self._generated_blocks: Dict[str, Tuple[str, str]] = {}
     
     def curate_optimal_context(self, blueprint: Blueprint,
                               dependencies: List[Blueprint],
@@ -293,10 +362,10 @@ class IntelligentContextCurator:
             )
             available_items.append(item)
         
-        # Add generated code context
+        # Add generated code context; dependents only need its public API
         for module_name, code in generated_context.items():
             item = ContextItem(
-                content=f"Generated code:\n{code}",
+                content=self._generated_code_block(module_name, code),
                 source_type="generated_code",
                 module_name=module_name,
                 priority="high"  # Generated code is usually highly relevant
@@ -315,6 +384,16 @@ class IntelligentContextCurator:
         
         return curation_result
     
+    def _generated_code_block(self, module_name: str, code: str) -> str:
+        """Return the context block for a module's generated code, summarizing each version once."""
+        digest = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        cached = self._generated_blocks.get(module_name)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        block = f"Generated code (API summary):\n{summarize_generated_code(code)}"
+        self._generated_blocks[module_name] = (digest, block)
+        return block
+
     def curate_comprehensive_context(self, resolved_blueprint,
                                    language: str = "python") -> List[str]:
         """Curate context for comprehensive generation (replacement for simple concatenation)."""
@@ -341,8 +420,8 @@ class IntelligentContextCurator:
             analyzed_items, self.max_tokens, resolved_blueprint.main
         )
         
-        # Add generation goal and instructions
-        final_context = curation_result.curated_context.copy()
+        # Add generation goal and instructions (the curation result is ours to extend)
+        final_context = curation_result.curated_context
         final_context.extend([
             f"Now generate {language} code for the following blueprint:",
             f"Module: {resolved_blueprint.main.module_name}",
@@ -361,16 +440,30 @@ class SmartContextBuilder:
     
     def __init__(self, max_tokens: int = 8000):
         self.curator = IntelligentContextCurator(max_tokens)
+        # Dependencies of the most recent resolved project paired with their
+        # stringified file paths, kept with the project so a recycled id never matches
+        self._dependency_paths: Optional[Tuple[object, List[Tuple[Blueprint, str]]]] = None
+
+    def _dependency_candidates(self, resolved_blueprint) -> List[Tuple[Blueprint, str]]:
+        """Return the project's dependencies with their file paths, computed once per project."""
+        cached = self._dependency_paths
+        if cached is not None and cached[0] is resolved_blueprint:
+            return cached[1]
+        candidates = [(dep, str(dep.file_path or "")) for dep in resolved_blueprint.dependencies]
+        self._dependency_paths = (resolved_blueprint, candidates)
+        return candidates
     
     def create_blueprint_context(self, blueprint: Blueprint, resolved_blueprint,
                                 generated_context: Dict[str, str], language: str) -> List[str]:
         """Smart context creation using curation (replaces simple concatenation)."""
         try:
-            # Get dependencies for this specific blueprint
+            # Get dependencies for this specific blueprint, each once even when
+            # several references resolve to it
+            ref_paths = [ref.module_path for ref in blueprint.blueprint_refs]
             dependencies = []
-            for ref in blueprint.blueprint_refs:
-                for dep in resolved_blueprint.dependencies:
-                    if dep.module_name == ref.module_path or ref.module_path in str(dep.file_path or ""):
+            if ref_paths:
+                for dep, dep_path in self._dependency_candidates(resolved_blueprint):
+                    if any(path == dep.module_name or path in dep_path for path in ref_paths):
                         dependencies.append(dep)
             
             curation_result = self.curator.curate_optimal_context(
@@ -378,7 +471,7 @@ class SmartContextBuilder:
                 f"Generate {language} code with proper imports and dependencies"
             )
             
-            context_parts = curation_result.curated_context.copy()
+            context_parts = curation_result.curated_context
             context_parts.extend([
                 f"Generate {language} code for:",
                 f"Module: {blueprint.module_name}",
@@ -405,7 +498,7 @@ class SmartContextBuilder:
         context_parts = ["Generate {} code from this blueprint:".format(language), ""]
         
         # Add some generated context if available
-        for module_name, code in list(generated_context.items())[:3]:  # Limit to prevent bloat
+        for module_name, code in islice(generated_context.items(), 3):  # Limit to prevent bloat
             context_parts.extend([
                 f"Available module: {module_name}",
                 code[:300] + "..." if len(code) > 300 else code,
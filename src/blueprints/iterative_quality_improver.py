@@ -7,11 +7,10 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
-from anthropic import Anthropic
-
+from .code_generator import extract_fenced_code
 from .parser import Blueprint
 from .constants import DEFAULT_MODEL
-from .utils import check_anthropic_api_key
+from .utils import check_anthropic_api_key, create_anthropic_client
 
 
 class QualityDimension(Enum):
@@ -258,13 +257,8 @@ Return ONLY the improved code without explanations.
                 messages=[{"role": "user", "content": improvement_prompt}]
             )
             
-            improved_code = response.content[0].text.strip()
-            
             # Remove code block markers if present
-            if improved_code.startswith(f"```{language}"):
-                improved_code = improved_code.split('\n', 1)[1]
-            if improved_code.endswith("```"):
-                improved_code = improved_code.rsplit('\n', 1)[0]
+            improved_code = extract_fenced_code(response.content[0].text)
             
             improvements_made = priority_issues + priority_improvements + specific_suggestions[:3]
             
@@ -339,7 +333,7 @@ class IterativeQualityImprover:
         check_anthropic_api_key("iterative quality improvement")
         
         
-        self.client = Anthropic()
+        self.client = create_anthropic_client()
         
         self.max_iterations = max_iterations
         self.code_reviewer = CodeReviewAgent(self.client)
@@ -490,10 +484,10 @@ class QualityEnhancedCodeGenerator:
         return initial_code
     
     def generate_single_with_context(self, resolved, output_path, language="python", 
-                                   force=False, verify=True):
+                                   force=False, verify=True, main_md_path=None):
         """Delegate to base generator - quality improvement handled at lower level."""
         return self.base_generator.generate_single_with_context(
-            resolved, output_path, language, force, verify
+            resolved, output_path, language, force, verify, main_md_path
         )
     
     def generate_project(self, resolved, output_dir, language="python", 
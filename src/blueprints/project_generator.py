@@ -1,14 +1,57 @@
 """Project-level code generation coordination and file management."""
 
+import re
+import threading
+from itertools import islice, repeat
 from pathlib import Path
-from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import click
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 
+from .config import config as default_config
 from .logging_config import get_logger
 from .parser import Blueprint
 from .resolver import ResolvedBlueprint
-from .code_generator import CodeGenerator
+from .code_generator import CodeGenerator, file_has_text, get_file_extension
+
+# Background threads writing generated files; several keep file creation and
+# metadata latency on slow (network, Windows) filesystems off the critical path
+_WRITER_THREADS = 4
+
+# Languages CodeVerifier can check; it parses with Python's ast, so anything else
+# would fail its syntax check and burn extra candidates on spurious retries
+_VERIFIABLE_LANGUAGES = frozenset({"python"})
+
+# A header is a "#"/"##" heading or a non-list line ending in ":"; the possessive
+# indent keeps "- item:" lines from being re-read as headers.
+_SECTION_HEADER_RE = re.compile(
+    r"^[^\S\n]*+(##[^\n]*|# [^\n]*?\S|(?!-)[^\n]*:)[^\S\n]*$", re.MULTILINE
+)
+_LIST_ITEM_RE = re.compile(r"^[^\S\n]*- ([^\n]*)$", re.MULTILINE)
+
+# Line prefixes recognized as commands in the installation and running sections
+_INSTALL_PREFIXES = ("pip install", "uv", "npm")
+_ENV_VAR_PREFIX = "export"
+_RUN_PREFIXES = ("uvicorn", "python", "npm", "node")
+
+
+def _command_line_re(prefixes) -> re.Pattern:
+    """Compile a pattern capturing whole lines that start with one of prefixes."""
+    alternatives = "|".join(map(re.escape, prefixes))
+    return re.compile(rf"^[^\S\n]*((?:{alternatives})[^\n]*)$", re.MULTILINE)
+
+
+_INSTALL_LINE_RE = _command_line_re((*_INSTALL_PREFIXES, _ENV_VAR_PREFIX))
+_RUN_LINE_RE = _command_line_re(_RUN_PREFIXES)
+
+# Header keywords -> section, checked in order against the lower-cased header
+_SECTION_KEYWORDS = (
+    ("third-party dependencies", "dependencies"),
+    ("dependencies:", "dependencies"),
+    ("dependencies to install:", "dependencies"),
+    ("development dependencies", "dev_dependencies"),
+    ("installation", "installation"),
+    ("running", "running"),
+)
 
 
 class ProjectGenerator:
@@ -17,6 +60,8 @@ class ProjectGenerator:
     def __init__(self, code_generator: CodeGenerator):
         """Initialize with a code generator instance."""
         self.code_generator = code_generator
+        # Guards output path checks made by concurrent generation workers
+        self._file_lock = threading.Lock()
 
     def generate_project(
         self,
@@ -37,13 +82,18 @@ class ProjectGenerator:
         logger.debug(f"Concurrent processing: {use_concurrent_processing}")
         
         output_dir.mkdir(parents=True, exist_ok=True)
+        concurrent = use_concurrent_processing and len(resolved.generation_order) > 1
+        self._check_output_paths(
+            resolved.generation_order, output_dir, language, force, concurrent
+        )
+        makefile_future = self._start_project_makefile(resolved, main_md_path, language)
 
         dependency_versions = {}
-        if main_md_path and main_md_path.exists():
+        if main_md_path:
             dependency_versions = self.code_generator.extract_dependency_versions(main_md_path)
 
         # Use concurrent processing for better performance
-        if use_concurrent_processing and len(resolved.generation_order) > 1:
+        if concurrent:
             logger.info(f"Using concurrent processing for {len(resolved.generation_order)} files")
             generated_files = self._generate_project_concurrent(
                 resolved, output_dir, language, dependency_versions, force, verify, main_md_path
@@ -54,17 +104,173 @@ class ProjectGenerator:
                 resolved, output_dir, language, dependency_versions, force, verify, main_md_path
             )
 
+        self._add_project_support_files(generated_files, language, force, makefile_future)
+        return generated_files
+
+    def generate_project_batched(
+        self,
+        resolved: ResolvedBlueprint,
+        output_dir: Path,
+        language: str = "python",
+        force: bool = False,
+        main_md_path: Optional[Path] = None,
+    ) -> Dict[str, Path]:
+        """Generate all blueprints through the Message Batches API, one batch per dependency level.
+
+        Blueprints in a level depend only on earlier levels, so each level is
+        submitted as a single batch once the previous one has been generated;
+        its files are written in the background while later levels run.
+        Falls back to generate_project when batches are unavailable.
+        """
+        logger = get_logger('project')
+        if not self.code_generator.supports_message_batches():
+            logger.warning("Message Batches API unavailable; falling back to standard generation")
+            return self.generate_project(resolved, output_dir, language, force, main_md_path)
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self._check_output_paths(resolved.generation_order, output_dir, language, force)
+        makefile_future = self._start_project_makefile(resolved, main_md_path, language)
+        dependency_versions = self._extract_dependency_versions_safe(main_md_path)
+
+        generated_files = {}
+        generated_context = {}
+        pending_writes = {}
+        levels = self._dependency_levels(resolved.generation_order)
+        # Context curation and adaptive prompt building can call Claude themselves,
+        # so a level's prompts are built concurrently before its batch is submitted
+        prompt_workers = max(1, default_config.max_concurrent_requests)
+        with ThreadPoolExecutor(max_workers=_WRITER_THREADS) as writer, \
+                ThreadPoolExecutor(max_workers=prompt_workers) as prompt_executor:
+            for level_number, level in enumerate(levels, 1):
+                logger.info(f"Generating level {level_number}/{len(levels)} ({len(level)} files) as a batch")
+                prompts = {}
+                models = {}
+                codes = {}
+                prompt_futures = {}
+                for blueprint in level:
+                    trivial_code = self.code_generator.render_trivial(blueprint, language)
+                    if trivial_code is not None:
+                        codes[blueprint.module_name] = trivial_code
+                        continue
+                    prompt_futures[blueprint.module_name] = prompt_executor.submit(
+                        self._build_batch_request,
+                        blueprint, resolved, generated_context, language, dependency_versions,
+                    )
+                for module_name, future in prompt_futures.items():
+                    prompts[module_name], models[module_name] = future.result()
+
+                codes.update(self.code_generator.generate_batch(prompts, models))
+                for blueprint in level:
+                    code = codes[blueprint.module_name]
+                    output_path = self.code_generator.determine_output_path(blueprint, output_dir, language)
+                    pending_writes[blueprint.module_name] = writer.submit(
+                        self.code_generator.save_generated_code, code, output_path, force
+                    )
+                    generated_files[blueprint.module_name] = output_path
+                    generated_context[blueprint.module_name] = code
+                    logger.info(f"✓ Generated {blueprint.module_name} -> {output_path}")
+
+        for module_name, write_future in pending_writes.items():
+            try:
+                write_future.result()
+            except Exception as e:
+                logger.error(f"Failed to write {module_name}: {str(e)}")
+                raise RuntimeError(f"Failed to generate code for {module_name}: {str(e)}")
+
+        self._add_project_support_files(generated_files, language, force, makefile_future)
+        return generated_files
+
+    def _check_output_paths(
+        self,
+        generation_order: List[Blueprint],
+        output_dir: Path,
+        language: str,
+        force: bool,
+        concurrent: bool = False,
+    ) -> None:
+        """Fail before any API call if an output file exists and force is off.
+
+        Checks the paths the selected writer will use without creating any
+        directories. Writes still refuse to overwrite, so a file created after
+        this check is not overwritten either.
+        """
+        if force:
+            return
+        for blueprint in generation_order:
+            if concurrent:
+                output_path = self._concurrent_output_path(blueprint, output_dir, language)
+            else:
+                output_path = self.code_generator.determine_output_path(
+                    blueprint, output_dir, language, create_dirs=False
+                )
+            if output_path.exists():
+                raise RuntimeError(
+                    f"Failed to generate code for {blueprint.module_name}: "
+                    f"File {output_path} already exists. Use --force to overwrite."
+                )
+
+    def _build_batch_request(
+        self,
+        blueprint: Blueprint,
+        resolved: ResolvedBlueprint,
+        generated_context: Dict[str, str],
+        language: str,
+        dependency_versions: Dict[str, str],
+    ) -> Tuple[str, str]:
+        """Curate context for a blueprint and build its generation prompt and model."""
+        context_parts = self.code_generator.create_blueprint_context(
+            blueprint, resolved, generated_context, language
+        )
+        return self.code_generator.build_request(
+            blueprint, context_parts, language, dependency_versions
+        )
+
+    def _dependency_levels(self, generation_order: List[Blueprint]) -> List[List[Blueprint]]:
+        """Group blueprints into levels whose members depend only on earlier levels (Kahn's algorithm)."""
+        waiting_on = self._map_blueprint_dependencies(generation_order)
+        levels = []
+        remaining = list(generation_order)
+        while remaining:
+            level = [bp for bp in remaining if not waiting_on[bp.module_name]]
+            levels.append(level)
+            done = {bp.module_name for bp in level}
+            remaining = [bp for bp in remaining if bp.module_name not in done]
+            for bp in remaining:
+                waiting_on[bp.module_name] -= done
+        return levels
+
+    def _start_project_makefile(
+        self,
+        resolved: ResolvedBlueprint,
+        main_md_path: Optional[Path],
+        language: str,
+    ) -> Future:
+        """Build the Makefile in the background; it depends only on the blueprints.
+
+        The future only holds the project root and Makefile text, so nothing is
+        written unless generation succeeds and _add_project_support_files runs.
+        """
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(self._build_project_makefile, resolved, main_md_path, language)
+        executor.shutdown(wait=False)
+        return future
+
+    def _add_project_support_files(
+        self,
+        generated_files: Dict[str, Path],
+        language: str,
+        force: bool,
+        makefile_future: Future,
+    ) -> None:
+        """Add package __init__.py files and the project Makefile to generated_files."""
         if language.lower() == "python":
             init_files = self._create_python_init_files(generated_files, force)
             generated_files.update(init_files)
 
-        makefile_path = self._generate_project_makefile(
-            resolved, main_md_path, language, force
-        )
+        project_root, makefile_content = makefile_future.result()
+        makefile_path = MakefileGenerator().write_makefile(makefile_content, project_root, force)
         if makefile_path:
             generated_files["Makefile"] = makefile_path
-
-        return generated_files
     
     def _generate_project_individual(
         self,
@@ -76,36 +282,197 @@ class ProjectGenerator:
         verify: bool,
         main_md_path: Optional[Path] = None,
     ) -> Dict[str, Path]:
-        """Generate files individually (original method)."""
+        """Generate files individually with each blueprint's dependency context.
+
+        A blueprint is submitted once every blueprint it references earlier in
+        generation_order has been generated, so independent branches of the
+        dependency graph are generated concurrently. Each blueprint only sees
+        the code of its direct and indirect dependencies, in generation order,
+        so its prompt does not depend on which other branches happen to have
+        finished. With verification on, a
+        dependent is started speculatively from a dependency's first candidate
+        while that candidate is still being verified; its result is kept only if
+        verification returns that same candidate, so it is exactly what waiting
+        would have produced, otherwise it is regenerated. Files are written on background threads; all writes are
+        settled before returning.
+        """
         logger = get_logger('project')
+        generation_order = resolved.generation_order
         generated_files = {}
         generated_context = {}
+        pending_writes = {}
+
+        parents = self._map_blueprint_dependencies(generation_order)
+        ancestors = self._transitive_dependencies(generation_order, parents)
+        dependents: Dict[str, List[Blueprint]] = {}
+        for blueprint in generation_order:
+            for dep_name in parents[blueprint.module_name]:
+                dependents.setdefault(dep_name, []).append(blueprint)
+
+        # First unverified candidate of each blueprint still being verified
+        candidates: Dict[str, str] = {}
+        # Candidate code each submitted blueprint was generated against
+        assumed: Dict[str, Dict[str, str]] = {}
+        # Finished blueprints waiting for the dependencies they speculated on
+        parked: Dict[str, Tuple[str, Path]] = {}
+
+        # API concurrency and rate limits are enforced per request by the code
+        # generator, so workers only need to cover the requests it lets through
+        max_workers = max(1, min(default_config.max_concurrent_requests, len(generation_order)))
+
+        with ThreadPoolExecutor(max_workers=_WRITER_THREADS) as writer, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures: Dict[Future, Tuple[bool, Blueprint]] = {}
+            candidate_futures: Dict[str, Future] = {}
+            completed_count = 0
 
-        for i, blueprint in enumerate(resolved.generation_order, 1):
-            logger.info(f"[{i}/{len(resolved.generation_order)}] Processing {blueprint.module_name}")
-            try:
-                code, output_path = self._generate_single_blueprint_file(
+            def can_start(blueprint: Blueprint) -> bool:
+                # Speculation is one level deep: only candidates of blueprints
+                # that were themselves generated from verified context are used
+                return all(
+                    name in generated_context or (name in candidates and not assumed[name])
+                    for name in parents[blueprint.module_name]
+                )
+
+            def submit(blueprint: Blueprint) -> None:
+                name = blueprint.module_name
+                speculated = {
+                    dep: candidates[dep]
+                    for dep in parents[name]
+                    if dep not in generated_context
+                }
+                assumed[name] = speculated
+                on_candidate = None
+                if verify and not speculated:
+                    candidate = Future()
+                    futures[candidate] = (True, blueprint)
+                    candidate_futures[name] = candidate
+                    on_candidate = candidate.set_result
+
+                suffix = " (speculative)" if speculated else ""
+                logger.info(f"Processing {name}{suffix}")
+                future = executor.submit(
+                    self._generate_single_blueprint_file,
                     blueprint,
                     resolved,
                     dependency_versions,
                     language,
                     output_dir,
-                    force,
                     verify,
                     main_md_path,
-                    generated_context,
+                    {
+                        dep: speculated[dep] if dep in speculated else generated_context[dep]
+                        for dep in ancestors[name]
+                    },
+                    on_candidate,
                 )
-                generated_files[blueprint.module_name] = output_path
-                generated_context[blueprint.module_name] = code
-                logger.info(f"✓ Generated {blueprint.module_name} -> {output_path}")
-            except Exception as e:
-                logger.error(f"Failed to generate {blueprint.module_name}: {str(e)}")
-                raise RuntimeError(
-                    f"Failed to generate code for {blueprint.module_name}: {str(e)}"
+                futures[future] = (False, blueprint)
+
+            def accept(blueprint: Blueprint, code: str, output_path: Path) -> None:
+                nonlocal completed_count
+                name = blueprint.module_name
+                completed_count += 1
+                generated_files[name] = output_path
+                generated_context[name] = code
+                candidates.pop(name, None)
+                pending_writes[name] = writer.submit(
+                    self.code_generator.save_generated_code, code, output_path, force
                 )
+                logger.info(f"✓ [{completed_count}/{len(generation_order)}] Generated {name} -> {output_path}")
+                for dependent in dependents.get(name, []):
+                    settle(dependent)
+
+            def settle(blueprint: Blueprint) -> None:
+                name = blueprint.module_name
+                if name in parked:
+                    speculated = assumed[name]
+                    if any(dep not in generated_context for dep in speculated):
+                        return
+                    code, output_path = parked.pop(name)
+                    if all(
+                        generated_context[dep] == candidate
+                        for dep, candidate in speculated.items()
+                    ):
+                        accept(blueprint, code, output_path)
+                    else:
+                        logger.info(f"Regenerating {name}: a dependency changed during verification")
+                        submit(blueprint)
+                elif name not in assumed and can_start(blueprint):
+                    submit(blueprint)
+
+            for blueprint in generation_order:
+                if not parents[blueprint.module_name]:
+                    submit(blueprint)
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry = futures.pop(future, None)
+                    if entry is None:
+                        # Candidate already superseded by its blueprint's final code
+                        continue
+                    is_candidate, blueprint = entry
+                    name = blueprint.module_name
+                    if is_candidate:
+                        candidate_futures.pop(name, None)
+                        if name not in generated_context:
+                            candidates[name] = future.result()
+                            for dependent in dependents.get(name, []):
+                                settle(dependent)
+                        continue
+
+                    # Trivial or failed generations never report a candidate
+                    candidate = candidate_futures.pop(name, None)
+                    if candidate is not None:
+                        futures.pop(candidate, None)
+                    try:
+                        parked[name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to generate {name}: {str(e)}")
+                        for pending in futures:
+                            pending.cancel()
+                        raise RuntimeError(
+                            f"Failed to generate code for {name}: {str(e)}"
+                        )
+                    settle(blueprint)
+
+        for module_name, write_future in pending_writes.items():
+            try:
+                write_future.result()
+            except Exception as e:
+                logger.error(f"Failed to write {module_name}: {str(e)}")
+                raise RuntimeError(f"Failed to generate code for {module_name}: {str(e)}")
 
         return generated_files
     
+    def _map_blueprint_dependencies(
+        self, generation_order: List[Blueprint]
+    ) -> Dict[str, Set[str]]:
+        """Map each blueprint to the earlier blueprints in generation_order it references."""
+        # File paths are stringified once for the whole project, not per comparison
+        candidates = [(bp.module_name, str(bp.file_path or "")) for bp in generation_order]
+        dependencies = {}
+        for i, blueprint in enumerate(generation_order):
+            ref_paths = [ref.module_path for ref in blueprint.blueprint_refs]
+            # Matched the same way SmartContextBuilder picks dependency context
+            dependencies[blueprint.module_name] = {
+                name
+                for name, file_path in islice(candidates, i)
+                if any(path == name or path in file_path for path in ref_paths)
+            } if ref_paths else set()
+        return dependencies
+
+    def _transitive_dependencies(
+        self, generation_order: List[Blueprint], parents: Dict[str, Set[str]]
+    ) -> Dict[str, List[str]]:
+        """Map each blueprint to everything it depends on, directly or not, in generation order."""
+        position = {bp.module_name: i for i, bp in enumerate(generation_order)}
+        closure: Dict[str, Set[str]] = {}
+        for blueprint in generation_order:
+            name = blueprint.module_name
+            closure[name] = set(parents[name]).union(*(closure[dep] for dep in parents[name]))
+        return {name: sorted(deps, key=position.__getitem__) for name, deps in closure.items()}
+
     def _generate_project_concurrent(
         self,
         resolved: ResolvedBlueprint,
@@ -116,14 +483,23 @@ class ProjectGenerator:
         verify: bool,
         main_md_path: Optional[Path] = None,
     ) -> Dict[str, Path]:
-        """Generate files concurrently using ThreadPoolExecutor."""
+        """Generate files concurrently using ThreadPoolExecutor.
+
+        Generation workers hand finished files to a single background writer so
+        they can start their next API call without waiting on the disk.
+        """
         logger = get_logger('project')
         generated_files = {}
         generated_context = {}
+        pending_writes = {}
+        writer = ThreadPoolExecutor(max_workers=_WRITER_THREADS)
         
-        # Determine optimal number of workers (max 4 to avoid API rate limits)
-        max_workers = min(4, len(resolved.generation_order))
+        # One worker per request slot the code generator allows in flight
+        max_workers = max(1, min(default_config.max_concurrent_requests, len(resolved.generation_order)))
         logger.info(f"Using {max_workers} concurrent threads for generation")
+
+        # The comprehensive context depends only on the project, so build it once
+        context_parts = self.code_generator.create_comprehensive_context(resolved, language)
         
         # Create a thread pool and submit all generation tasks
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -134,12 +510,15 @@ class ProjectGenerator:
                     self._generate_single_blueprint_thread_safe,
                     blueprint,
                     resolved,
+                    context_parts,
                     dependency_versions,
                     language,
                     output_dir,
                     force,
                     verify,
-                    main_md_path
+                    main_md_path,
+                    writer,
+                    pending_writes,
                 )
                 future_to_blueprint[future] = blueprint
             
@@ -222,6 +601,14 @@ class ProjectGenerator:
             self._log_verification_summary(verification_summary)
             logger.info("Concurrent verification completed")
         
+        writer.shutdown(wait=True)
+        for module_name, write_future in pending_writes.items():
+            try:
+                write_future.result()
+            except Exception as e:
+                logger.error(f"✗ Failed to write {module_name}: {str(e)}")
+                generated_files.pop(module_name, None)
+
         logger.info(f"Concurrent generation completed: {len(generated_files)}/{len(resolved.generation_order)} files")
         return generated_files
     
@@ -229,19 +616,19 @@ class ProjectGenerator:
         self,
         blueprint: Blueprint,
         resolved: ResolvedBlueprint,
+        context_parts: List[str],
         dependency_versions: Dict[str, str],
         language: str,
         output_dir: Path,
         force: bool,
         verify: bool,
         main_md_path: Optional[Path],
+        writer: Optional[ThreadPoolExecutor] = None,
+        pending_writes: Optional[Dict[str, Future]] = None,
     ) -> tuple[str, Path]:
-        """Thread-safe single blueprint generation."""
+        """Thread-safe single blueprint generation with shared project context."""
         logger = get_logger('project')
         
-        # Build context - this is thread-safe since we're only reading
-        context_parts = self.code_generator.create_comprehensive_context(resolved, language)
-        
         # Generate code
         try:
             if verify:
@@ -285,7 +672,7 @@ class ProjectGenerator:
             
             # Write to file (this needs to be thread-safe too)
             output_path = self._write_generated_file_thread_safe(
-                blueprint, code, output_dir, language, force
+                blueprint, code, output_dir, language, force, writer, pending_writes
             )
             
             return code, output_path
@@ -300,35 +687,46 @@ class ProjectGenerator:
         code: str, 
         output_dir: Path, 
         language: str,
-        force: bool
+        force: bool,
+        writer: Optional[ThreadPoolExecutor] = None,
+        pending_writes: Optional[Dict[str, Future]] = None,
     ) -> Path:
-        """Thread-safe file writing with proper locking."""
-        import threading
-        from .cli.main import get_file_extension
-        
-        # Use a lock for file operations (though Path operations are generally thread-safe)
-        if not hasattr(self, '_file_lock'):
-            self._file_lock = threading.Lock()
-        
+        """Thread-safe file writing with proper locking.
+
+        With a writer executor the write itself is queued on it and its future
+        recorded in pending_writes; the existence check still happens here.
+        """
+        output_path = self._concurrent_output_path(blueprint, output_dir, language)
+
         with self._file_lock:
-            # Ensure output_dir is absolute
-            if not output_dir.is_absolute():
-                output_dir = output_dir.resolve()
-            
-            # Determine output path
-            module_path = blueprint.module_name.replace('.', '/')
-            output_path = output_dir / f"{module_path}{get_file_extension(language)}"
-            
-            # Create parent directories
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
             # Check if file exists
             if output_path.exists() and not force:
                 raise FileExistsError(f"Output file already exists: {output_path}")
             
-            # Write the file
-            output_path.write_text(code, encoding='utf-8')
+            if writer is not None:
+                pending_writes[blueprint.module_name] = writer.submit(
+                    self._write_file, output_path, code
+                )
+            else:
+                self._write_file(output_path, code)
             return output_path
+
+    @staticmethod
+    def _concurrent_output_path(blueprint: Blueprint, output_dir: Path, language: str) -> Path:
+        """Output path used by concurrent generation: the module path under output_dir."""
+        # Ensure output_dir is absolute
+        if not output_dir.is_absolute():
+            output_dir = output_dir.resolve()
+        module_path = blueprint.module_name.replace('.', '/')
+        return output_dir / f"{module_path}{get_file_extension(language)}"
+
+    @staticmethod
+    def _write_file(output_path: Path, code: str) -> None:
+        """Create parent directories and write generated code."""
+        if file_has_text(output_path, code):
+            return
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(code, encoding='utf-8')
     
     def _verify_generated_code_concurrent(
         self, 
@@ -428,33 +826,42 @@ class ProjectGenerator:
         language: str = "python",
         force: bool = False,
         verify: bool = True,
+        main_md_path: Optional[Path] = None,
     ) -> Path:
-        """Generate a single file with all dependencies as context in one API call."""
+        """Generate a single file with all dependencies as context in one API call.
+
+        main.md is looked up from the blueprint's directory unless main_md_path is given.
+        """
+        # Ask before spending an API call on a file the user will not overwrite;
+        # the answer is read from stdin as before, so piped input still works
+        if not force and output_path.exists():
+            import click
+
+            if not click.confirm(f"File {output_path} already exists. Overwrite?"):
+                raise RuntimeError("Generation cancelled by user")
+
         context_parts = self.code_generator.create_comprehensive_context(resolved, language)
 
-        dependency_versions = {}
-        if resolved.main.file_path:
-            project_root = resolved.main.file_path.parent
+        project_root = (
+            resolved.main.file_path.parent if resolved.main.file_path else output_path.parent
+        )
+        # Looked up once for both dependency versions and verification
+        if main_md_path is None and (resolved.main.file_path or verify):
             main_md_path = self.code_generator.find_main_md_in_project(project_root)
-            if main_md_path:
-                dependency_versions = self.code_generator.extract_dependency_versions(main_md_path)
+
+        dependency_versions = {}
+        if resolved.main.file_path and main_md_path:
+            dependency_versions = self.code_generator.extract_dependency_versions(main_md_path)
 
         try:
             if verify:
-                project_root = (
-                    resolved.main.file_path.parent
-                    if resolved.main.file_path
-                    else output_path.parent
-                )
-                main_md_for_verification = self.code_generator.find_main_md_in_project(project_root)
-
                 code, verification_results = self.code_generator.generate_with_verification(
                     resolved.main,
                     context_parts,
                     language,
                     max_retries=2,
                     project_root=project_root,
-                    main_md_path=main_md_for_verification,
+                    main_md_path=main_md_path,
                 )
                 self._log_verification_warnings(resolved.main.module_name, verification_results)
             else:
@@ -462,12 +869,8 @@ class ProjectGenerator:
                     resolved.main, context_parts, language, dependency_versions
                 )
 
-            if output_path.exists() and not force:
-                if not click.confirm(f"File {output_path} already exists. Overwrite?"):
-                    raise RuntimeError("Generation cancelled by user")
-
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_text(code)
+            # Readers of output_path never see a partially written file
+            self.code_generator.write_text_atomic(output_path, code)
 
             return output_path
 
@@ -483,23 +886,21 @@ class ProjectGenerator:
         dependency_versions: Dict[str, str],
         language: str,
         output_dir: Path,
-        force: bool,
         verify: bool,
         main_md_path: Optional[Path],
         generated_context: Dict[str, str],
+        on_candidate: Optional[Callable[[str], None]] = None,
     ) -> tuple[str, Path]:
-        """Generate code for a single blueprint and return code and output path."""
+        """Generate code for a single blueprint and return code and its output path."""
         context_parts = self.code_generator.create_blueprint_context(
             blueprint, resolved, generated_context, language
         )
 
         code = self._generate_code_with_verification(
-            blueprint, context_parts, language, verify, main_md_path
+            blueprint, context_parts, language, verify, main_md_path, on_candidate
         )
 
         output_path = self.code_generator.determine_output_path(blueprint, output_dir, language)
-        self.code_generator.save_generated_code(code, output_path, force)
-
         return code, output_path
 
     def _generate_code_with_verification(
@@ -509,9 +910,12 @@ class ProjectGenerator:
         language: str,
         verify: bool,
         main_md_path: Optional[Path],
+        on_candidate: Optional[Callable[[str], None]] = None,
     ) -> str:
         """Generate code for blueprint with optional verification."""
-        if not verify:
+        # Blueprints without components or requirements give the verifier nothing to check
+        has_spec = blueprint.components or blueprint.requirements
+        if not verify or language.lower() not in _VERIFIABLE_LANGUAGES or not has_spec:
             return self.code_generator.generate_single_blueprint(blueprint, context_parts, language)
 
         project_root = blueprint.file_path.parent if blueprint.file_path else Path.cwd()
@@ -522,6 +926,7 @@ class ProjectGenerator:
             max_retries=2,
             project_root=project_root,
             main_md_path=main_md_path,
+            on_candidate=on_candidate,
         )
 
         self._log_verification_warnings(blueprint.module_name, verification_results)
@@ -531,7 +936,7 @@ class ProjectGenerator:
         self, main_md_path: Optional[Path]
     ) -> Dict[str, str]:
         """Safely extract dependency versions from main.md."""
-        if not main_md_path or not main_md_path.exists():
+        if not main_md_path:
             return {}
         return self.code_generator.extract_dependency_versions(main_md_path)
 
@@ -551,36 +956,49 @@ class ProjectGenerator:
         """Create __init__.py files in all directories containing Python files."""
         init_files = {}
 
-        python_dirs = set()
-        for module_name, file_path in generated_files.items():
-            if file_path.suffix == ".py":
-                python_dirs.add(file_path.parent)
+        generated_paths = set(generated_files.values())
+        init_paths = {
+            file_path.parent / "__init__.py"
+            for file_path in generated_paths
+            if file_path.suffix == ".py"
+        } - generated_paths
 
-        for dir_path in python_dirs:
-            init_path = dir_path / "__init__.py"
-
-            if init_path in generated_files.values():
-                continue
-
-            if not init_path.exists() or force:
-                init_path.write_text("")
-                module_key = f"{dir_path.name}.__init__"
-                init_files[module_key] = init_path
+        with ThreadPoolExecutor(max_workers=_WRITER_THREADS) as pool:
+            for init_path, created in zip(
+                init_paths, pool.map(self._ensure_init_file, init_paths, repeat(force))
+            ):
+                if created:
+                    init_files[f"{init_path.parent.name}.__init__"] = init_path
 
         return init_files
 
-    def _generate_project_makefile(
+    @staticmethod
+    def _ensure_init_file(init_path: Path, force: bool) -> bool:
+        """Make init_path an empty file unless it exists and force is off; report whether it is ours."""
+        # One stat answers both "exists?" and "already empty?"
+        try:
+            is_empty = init_path.stat().st_size == 0
+        except FileNotFoundError:
+            init_path.write_text("")
+            return True
+        if not force:
+            return False
+        if not is_empty:
+            init_path.write_text("")
+        return True
+
+    def _build_project_makefile(
         self,
         resolved: ResolvedBlueprint,
         main_md_path: Optional[Path],
         language: str,
-        force: bool,
-    ) -> Optional[Path]:
-        """Generate project Makefile."""
+    ) -> Tuple[Path, str]:
+        """Build the project Makefile text and find the project root it belongs in."""
         project_root = self._find_project_root(resolved, main_md_path)
-        return MakefileGenerator().generate_makefile(
-            resolved, project_root, language, force, main_md_path
+        makefile_content = MakefileGenerator().build_makefile_content(
+            resolved, language, main_md_path
         )
+        return project_root, makefile_content
 
     def _find_project_root(
         self, resolved: ResolvedBlueprint, main_md_path: Optional[Path] = None
@@ -611,19 +1029,31 @@ class MakefileGenerator:
         main_md_path: Optional[Path] = None,
     ) -> Optional[Path]:
         """Generate a Makefile with project setup and run commands."""
+        makefile_content = self.build_makefile_content(resolved, language, main_md_path)
+        return self.write_makefile(makefile_content, output_dir, force)
+
+    def build_makefile_content(
+        self,
+        resolved: ResolvedBlueprint,
+        language: str,
+        main_md_path: Optional[Path] = None,
+    ) -> str:
+        """Build the Makefile text without writing it."""
         main_md_blueprint = self._find_main_blueprint(resolved, main_md_path)
         setup_blueprint = main_md_blueprint if main_md_blueprint else resolved.main
 
         app_module = self._find_app_module(resolved)
 
         project_info = self._extract_project_info(setup_blueprint)
-        makefile_content = self._create_makefile_content(
+        return self._create_makefile_content(
             setup_blueprint.module_name,
             project_info,
             language,
             app_module,
         )
 
+    def write_makefile(self, makefile_content: str, output_dir: Path, force: bool) -> Optional[Path]:
+        """Write a Makefile unless it is empty or an existing one must be kept."""
         if not makefile_content.strip():
             return None
 
@@ -632,15 +1062,25 @@ class MakefileGenerator:
         if makefile_path.exists() and not force:
             return None
 
-        makefile_path.write_text(makefile_content)
+        if not file_has_text(makefile_path, makefile_content):
+            makefile_path.write_text(makefile_content)
         return makefile_path
 
     def _find_main_blueprint(self, resolved: ResolvedBlueprint, main_md_path: Optional[Path]):
-        """Find the main.md blueprint for project setup info."""
-        if main_md_path and main_md_path.exists():
-            from .parser import BlueprintParser
-            parser = BlueprintParser()
-            return parser.parse_file(main_md_path)
+        """Find the main.md blueprint for project setup info.
+
+        A main.md the resolver already parsed is reused; parsing costs a Claude call.
+        """
+        if main_md_path:
+            target = main_md_path.resolve()
+            for blueprint in (resolved.main, *resolved.generation_order):
+                if blueprint.file_path and blueprint.file_path.resolve() == target:
+                    return blueprint
+
+            if main_md_path.exists():
+                from .parser import BlueprintParser
+                parser = BlueprintParser()
+                return parser.parse_file(main_md_path)
 
         for blueprint in resolved.generation_order:
             if blueprint.file_path and blueprint.file_path.name == "main.md":
@@ -669,61 +1109,41 @@ class MakefileGenerator:
             "env_vars": [],
         }
 
-        content_lines = setup_blueprint.raw_content.split("\n")
-        current_section = None
-
-        for line in content_lines:
-            line = line.strip()
-
-            if self._is_section_header(line):
-                current_section = self._identify_section(line)
+        # re.split with one capture group yields [preamble, header, body, header, body, ...]
+        parts = _SECTION_HEADER_RE.split(setup_blueprint.raw_content)
+        for header, body in zip(parts[1::2], parts[2::2]):
+            section = self._identify_section(header)
+            if not section:
                 continue
 
-            if current_section and line.startswith("- "):
-                self._process_section_line(line, current_section, info)
-            elif current_section == "installation" and self._is_command_line(line):
-                info["install_commands"].append(line)
-            elif current_section == "installation" and line.startswith("export"):
-                info["env_vars"].append(line)
-            elif current_section == "running" and self._is_run_command(line):
-                info["run_commands"].append(line)
+            # Command sections have no list in info, so only list sections scan for "- " items
+            if section == "installation":
+                for command in _INSTALL_LINE_RE.findall(body):
+                    command = command.rstrip()
+                    key = "env_vars" if command.startswith(_ENV_VAR_PREFIX) else "install_commands"
+                    info[key].append(command)
+            elif section == "running":
+                info["run_commands"].extend(
+                    command.rstrip() for command in _RUN_LINE_RE.findall(body)
+                )
+            else:
+                for item in _LIST_ITEM_RE.findall(body):
+                    self._process_section_line(item, section, info)
 
         return info
 
-    def _is_section_header(self, line: str) -> bool:
-        """Check if line is a section header."""
-        return (line.startswith("##") or line.startswith("# ") or 
-                (line.endswith(":") and not line.startswith("-")))
-
     def _identify_section(self, line: str) -> Optional[str]:
         """Identify which section type this header represents."""
         line_lower = line.lower()
-        if ("third-party dependencies" in line_lower or "dependencies:" in line_lower or 
-            "dependencies to install:" in line_lower):
-            return "dependencies"
-        elif "development dependencies" in line_lower:
-            return "dev_dependencies"
-        elif "installation" in line_lower:
-            return "installation"
-        elif "running" in line_lower:
-            return "running"
+        for keyword, section in _SECTION_KEYWORDS:
+            if keyword in line_lower:
+                return section
         return None
 
-    def _is_command_line(self, line: str) -> bool:
-        """Check if line contains installation commands."""
-        return (line.startswith("pip install") or line.startswith("uv") or 
-                line.startswith("npm"))
-
-    def _is_run_command(self, line: str) -> bool:
-        """Check if line contains run commands."""
-        return (line.startswith("uvicorn") or line.startswith("python") or 
-                line.startswith("npm") or line.startswith("node"))
-
-    def _process_section_line(self, line: str, section: str, info: Dict) -> None:
-        """Process a line within a specific section."""
-        content = line[2:].split("#")[0].strip()  # Remove "- " and comments
-        if " - " in content:
-            content = content.split(" - ")[0].strip()  # Handle new format
+    def _process_section_line(self, item: str, section: str, info: Dict) -> None:
+        """Process a list item (without its "- " marker) within a specific section."""
+        content = item.partition("#")[0].strip()  # Remove comments
+        content = content.partition(" - ")[0].strip()  # Handle new format
         if content and section in info:
             info[section].append(content)
 
@@ -735,6 +1155,7 @@ class MakefileGenerator:
         app_module: Optional[str] = None,
     ) -> str:
         """Create Makefile content based on project information."""
+        language = language.lower()
         lines = [
             f"# Makefile for {project_name}",
             f"# Generated by blueprints.md",
@@ -786,7 +1207,7 @@ class MakefileGenerator:
 
     def _add_install_commands(self, lines: List[str], project_info: Dict, language: str) -> None:
         """Add installation commands."""
-        if language.lower() == "python":
+        if language == "python":
             if project_info["dependencies"]:
                 lines.extend([
                     "install: requirements.txt",
@@ -802,7 +1223,7 @@ class MakefileGenerator:
                     "\tpip install -r requirements-dev.txt",
                     "",
                 ])
-        elif language.lower() in ["javascript", "typescript"]:
+        elif language in ["javascript", "typescript"]:
             lines.extend([
                 "install:",
                 "\t@echo 'Installing dependencies...'",
@@ -859,7 +1280,7 @@ class MakefileGenerator:
         self, lines: List[str], language: str, project_name: str, app_module: Optional[str]
     ) -> None:
         """Add default run commands based on language."""
-        if language.lower() == "python":
+        if language == "python":
             module_to_run = app_module if app_module else project_name
             lines.extend([
                 "run:",
@@ -871,7 +1292,7 @@ class MakefileGenerator:
                 f"\tpython -m {module_to_run} --reload",
                 "",
             ])
-        elif language.lower() in ["javascript", "typescript"]:
+        elif language in ["javascript", "typescript"]:
             lines.extend([
                 "run:",
                 "\t@echo 'Starting application...'",
@@ -885,14 +1306,14 @@ class MakefileGenerator:
 
     def _add_test_command(self, lines: List[str], language: str) -> None:
         """Add test command."""
-        if language.lower() == "python":
+        if language == "python":
             lines.extend(["test:", "\t@echo 'Running tests...'", "\tpytest", ""])
-        elif language.lower() in ["javascript", "typescript"]:
+        elif language in ["javascript", "typescript"]:
             lines.extend(["test:", "\t@echo 'Running tests...'", "\tnpm test", ""])
 
     def _add_clean_command(self, lines: List[str], language: str) -> None:
         """Add clean command."""
-        if language.lower() == "python":
+        if language == "python":
             lines.extend([
                 "clean:",
                 "\t@echo 'Cleaning up...'",
@@ -901,7 +1322,7 @@ class MakefileGenerator:
                 "\trm -f requirements.txt requirements-dev.txt",
                 "",
             ])
-        elif language.lower() in ["javascript", "typescript"]:
+        elif language in ["javascript", "typescript"]:
             lines.extend([
                 "clean:",
                 "\t@echo 'Cleaning up...'",
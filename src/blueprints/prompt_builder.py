@@ -110,6 +110,32 @@ class PromptBuilder:
 
         return "\n".join(prompt_parts)
 
+    def build_declarations_prompt(self, blueprint: Blueprint, context_parts: List[str]) -> str:
+        """Build a prompt asking for a constants-only module as JSON fields."""
+        prompt_parts = context_parts.copy()
+        prompt_parts.extend([
+            f"Module: {blueprint.module_name}",
+            f"Description: {blueprint.description}",
+            "",
+            "Declarations:",
+        ])
+        for component in blueprint.components:
+            prompt_parts.extend(self._format_component_for_prompt(component))
+        if blueprint.notes:
+            prompt_parts.extend(["", "Notes:", *[f"- {note}" for note in blueprint.notes]])
+
+        prompt_parts.extend([
+            "",
+            "Return a JSON object with the Python source for this module's declarations:",
+            '{"imports": ["<import statement>", ...],',
+            ' "definitions": [{"name": "<name>", "annotation": "<type or null>", "value": "<expression>"}, ...]}',
+            "- One definition per declaration above, in the same order",
+            "- Fill in any value the declaration leaves out",
+            "- Imports cover every name the annotations and values use; use ABSOLUTE imports",
+            "Return ONLY the JSON in one fenced block.",
+        ])
+        return "\n".join(prompt_parts)
+
     def _format_component_for_prompt(self, component: Component) -> List[str]:
         """Format a single component for inclusion in prompt."""
         parts = [""]
@@ -353,4 +379,4 @@ class PromptBuilder:
             "- Ensure the implementation is production-ready and robust",
             "",
             "Return ONLY the code without explanations, comments, or tests.",
-        ]
\ No newline at end of file
+        ]
@@ -1,9 +1,25 @@
 """Utility functions used throughout the blueprints package."""
 
+import importlib.util
 import os
+import threading
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
 from .constants import FALLBACK_BLUEPRINT_SPEC, get_api_key_error
 
+# One pooled HTTP client shared by every Anthropic client so keep-alive connections
+# (and their TLS sessions) are reused across components, instances and threads.
+_shared_http_client: Optional["DefaultHttpxClient"] = None
+_shared_http_client_lock = threading.Lock()
+
+# HTTP/2 lets concurrent requests multiplex over one connection; the SDK's HTTP
+# client needs the optional h2 package for it (pip install "blueprints-md[http2]")
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+if TYPE_CHECKING:
+    from anthropic import Anthropic, DefaultHttpxClient
+
 
 def load_blueprint_spec() -> str:
     """Load blueprint specification from BLUEPRINTS_SPEC.md or return fallback."""
@@ -19,6 +35,28 @@ def check_anthropic_api_key(purpose: str) -> None:
         raise ValueError(get_api_key_error(purpose))
 
 
+def get_shared_http_client() -> "DefaultHttpxClient":
+    """Return the process-wide HTTP client used for Anthropic requests.
+
+    Built from the SDK's own client class so it always matches the HTTP package
+    the installed SDK expects, keeping the SDK's default timeout and pool limits.
+    """
+    global _shared_http_client
+    with _shared_http_client_lock:
+        if _shared_http_client is None:
+            from anthropic import DefaultHttpxClient
+
+            _shared_http_client = DefaultHttpxClient(http2=_HTTP2_AVAILABLE)
+        return _shared_http_client
+
+
+def create_anthropic_client(**options) -> "Anthropic":
+    """Create an Anthropic client on the shared HTTP client; options go to the constructor."""
+    from anthropic import Anthropic
+
+    return Anthropic(http_client=get_shared_http_client(), **options)
+
+
 def safe_operation(operation, default_result=None, error_message=None):
     """Execute operation safely, returning default_result on any exception."""
     try:
@@ -1,3 +1,4 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional
@@ -6,11 +7,9 @@ import json
 import re
 import os
 
-from anthropic import Anthropic
-
 from .constants import DEFAULT_MODEL
 from .logging_config import get_logger
-from .utils import check_anthropic_api_key
+from .utils import check_anthropic_api_key, create_anthropic_client
 
 
 @dataclass
@@ -34,7 +33,7 @@ class CodeVerifier:
         check_anthropic_api_key("code verification")
         
         
-        self.client = Anthropic()
+        self.client = create_anthropic_client()
 
     def verify_syntax(self, code: str) -> VerificationResult:
         """Check if code has valid Python syntax"""
@@ -145,28 +144,44 @@ class CodeVerifier:
             return results
         logger.debug("✓ Syntax check passed")
 
-        # Check imports
+        # Import and blueprint checks are independent Claude calls, so run them concurrently
         logger.debug("Checking imports...")
-        import_result = self.verify_imports(code)
-        results.append(import_result)
-        if import_result.success:
-            logger.debug("✓ Import check passed")
-        else:
-            logger.warning(f"Import issues found: {len(import_result.suggestions)} suggestions")
-
-        # Check blueprint requirements if provided
-        if blueprint:
-            logger.debug(f"Checking blueprint requirements for: {blueprint.module_name}")
-            blueprint_result = self.verify_blueprint_requirements(code, blueprint)
-            results.append(blueprint_result)
-            if blueprint_result.success:
-                logger.debug("✓ Blueprint requirements check passed")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            import_future = executor.submit(self.verify_imports, code)
+            blueprint_future = None
+            if blueprint:
+                logger.debug(f"Checking blueprint requirements for: {blueprint.module_name}")
+                blueprint_future = executor.submit(self.verify_blueprint_requirements, code, blueprint)
+
+            import_result = self._collect_check_result(import_future, "import")
+            results.append(import_result)
+            if import_result.success:
+                logger.debug("✓ Import check passed")
             else:
-                logger.warning(f"Blueprint requirements not met: {blueprint_result.error_message}")
+                logger.warning(f"Import issues found: {len(import_result.suggestions)} suggestions")
+
+            if blueprint_future:
+                blueprint_result = self._collect_check_result(blueprint_future, "blueprint")
+                results.append(blueprint_result)
+                if blueprint_result.success:
+                    logger.debug("✓ Blueprint requirements check passed")
+                else:
+                    logger.warning(f"Blueprint requirements not met: {blueprint_result.error_message}")
 
         logger.info(f"Verification completed: {sum(1 for r in results if r.success)}/{len(results)} checks passed")
         return results
 
+    def _collect_check_result(self, future: Future, error_type: str) -> VerificationResult:
+        """Wait for a concurrent check, turning unexpected exceptions into a failed result"""
+        try:
+            return future.result()
+        except Exception as e:
+            return VerificationResult(
+                success=False,
+                error_type=error_type,
+                error_message=f"Verification failed: {str(e)}",
+            )
+
     def _generate_verification_prompt(self, blueprint: "Blueprint") -> str:
         """Generate a verification prompt based on blueprint requirements"""
         cache_key = f"{blueprint.module_name}_{hash(blueprint.raw_content)}"
@@ -284,7 +299,8 @@ Be practical - minor style issues don't matter, focus on functional completeness
                 if not self._is_function_imported(function, code):
                     missing.append(import_statement)
         
-        return missing
+        # Several functions can map to the same import statement
+        return list(dict.fromkeys(missing))
 
     def _get_common_import_mappings(self, code: str) -> dict[str, str]:
         """Get import mappings using Claude-based analysis"""
@@ -0,0 +1,422 @@
+"""Tests for CodeGenerator's request handling, using a stubbed Anthropic client."""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import anthropic
+import pytest
+
+import blueprints.verifier
+from blueprints import code_generator
+from blueprints.code_generator import CodeGenerator
+from blueprints.config import config
+from blueprints.parser import Blueprint, Component, Method
+
+
+class _Stream:
+    """Context manager standing in for client.messages.stream()."""
+
+    def __init__(self, chunks, delay=0.0, stop_reason="end_turn"):
+        self.chunks = chunks
+        self.delay = delay
+        self.stop_reason = stop_reason
+        self.closed = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed.set()
+
+    @property
+    def text_stream(self):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield chunk
+
+    def get_final_message(self):
+        return SimpleNamespace(stop_reason=self.stop_reason)
+
+
+class _Messages:
+    """Stub of client.messages that hands out streams from a factory."""
+
+    def __init__(self, make_stream):
+        self.make_stream = make_stream
+        self.calls = []
+        self.streams = []
+        self.lock = threading.Lock()
+
+    def stream(self, **params):
+        with self.lock:
+            self.calls.append(params)
+            stream = self.make_stream(len(self.calls) - 1)
+            self.streams.append(stream)
+        return stream
+
+
+class _Client:
+    def __init__(self, make_stream):
+        self.messages = _Messages(make_stream)
+
+
+class _Result:
+    def __init__(self, success):
+        self.success = success
+        self.error_message = None if success else "failed"
+
+
+class _Verifier:
+    """CodeVerifier stand-in that passes code listed in `passing`."""
+
+    passing = set()
+
+    def __init__(self, project_root=None):
+        pass
+
+    def verify_all(self, code, blueprint=None):
+        return [_Result(code in self.passing)]
+
+
+def _fenced(code):
+    return f"```python\n{code}\n```"
+
+
+@pytest.fixture
+def generator(tmp_path):
+    generator = CodeGenerator(api_key="test-key", cache_dir=tmp_path / "cache")
+    generator.prompt_builder.record_generation_result = lambda *args: None
+    return generator
+
+
+@pytest.fixture
+def verifying_generator(generator, monkeypatch):
+    monkeypatch.setattr(blueprints.verifier, "CodeVerifier", _Verifier)
+    monkeypatch.setattr(generator, "_generate_declarations", lambda *args: None)
+    monkeypatch.setattr(generator, "_build_generation_prompt", lambda *args: "PROMPT")
+    generator.temperature = 0.7
+    return generator
+
+
+def test_race_stops_losing_streams(verifying_generator, monkeypatch):
+    monkeypatch.setattr(config, "race_candidates", True)
+    monkeypatch.setattr(_Verifier, "passing", {"fast = 1"})
+    # The first request answers at once; the others would stream for seconds
+    client = _Client(
+        lambda i: _Stream([_fenced("fast = 1")]) if i == 0 else _Stream(["x"] * 100, delay=0.05)
+    )
+    verifying_generator.client = client
+
+    code, results = verifying_generator.generate_with_verification(
+        Blueprint(module_name="app.fast"), [], max_retries=3
+    )
+
+    assert code == "fast = 1"
+    assert all(result.success for result in results)
+    # Losers that had not started by then are never sent
+    assert len(client.messages.calls) <= 3
+    for stream in client.messages.streams:
+        assert stream.closed.wait(timeout=1)
+
+
+@pytest.mark.parametrize("stop_on_success, expected_calls", [(True, 2), (False, 3)])
+def test_retries_stop_at_first_passing_candidate(
+    verifying_generator, monkeypatch, stop_on_success, expected_calls
+):
+    monkeypatch.setattr(_Verifier, "passing", {"second = 2"})
+    responses = ["first = 1", "second = 2", "third = 3"]
+    client = _Client(lambda i: _Stream([_fenced(responses[i])]))
+    verifying_generator.client = client
+
+    code, results = verifying_generator.generate_with_verification(
+        Blueprint(module_name="app.retry"), [], max_retries=3, stop_on_success=stop_on_success
+    )
+
+    assert code == "second = 2"
+    assert all(result.success for result in results)
+    assert len(client.messages.calls) == expected_calls
+
+
+def test_truncated_response_is_reported(generator, caplog):
+    generator.client = _Client(lambda i: _Stream(["```python\nvalue = ("], stop_reason="max_tokens"))
+
+    with caplog.at_level(logging.WARNING):
+        generator._call_claude_api("PROMPT", cache=False)
+
+    assert "token limit" in caplog.text
+    assert "stop_sequences" not in generator.client.messages.calls[0]
+
+
+def _small_blueprint():
+    blueprint = Blueprint(module_name="app.small")
+    blueprint.components = [Component(type="function", name="add", methods=[Method("add", "a, b")])]
+    return blueprint
+
+
+def test_light_model_routing_is_opt_in(tmp_path, monkeypatch):
+    generator = CodeGenerator(api_key="test-key", cache_dir=tmp_path)
+    assert generator.pick_model(_small_blueprint()) == config.default_model
+
+    monkeypatch.setattr(config, "light_model", "light-model")
+    generator = CodeGenerator(api_key="test-key", cache_dir=tmp_path)
+
+    assert generator.pick_model(_small_blueprint()) == "light-model"
+
+
+def test_build_request_returns_prompt_and_routed_model(generator, monkeypatch):
+    monkeypatch.setattr(generator, "light_model", "light-model")
+    monkeypatch.setattr(
+        generator.prompt_builder,
+        "build_single_blueprint_prompt",
+        lambda blueprint, language, context_parts, versions: f"{blueprint.module_name}|{context_parts}",
+    )
+
+    prompt, model = generator.build_request(_small_blueprint(), ["ctx"], "python")
+
+    assert (prompt, model) == ("app.small|['ctx']", "light-model")
+
+
+def test_identical_requests_reuse_the_cached_response(generator):
+    generator.client = _Client(lambda i: _Stream([_fenced(f"value = {i}")]))
+
+    first = generator._call_claude_api("PROMPT")
+    second = generator._call_claude_api("PROMPT")
+
+    assert first == second == "value = 0"
+    assert len(generator.client.messages.calls) == 1
+    assert [path.suffix for path in generator.cache_dir.iterdir()] == [".txt"]
+
+
+def test_expired_cache_entries_are_fetched_again(generator, monkeypatch):
+    monkeypatch.setattr(config, "response_cache_ttl", 60)
+    generator.client = _Client(lambda i: _Stream([_fenced(f"value = {i}")]))
+    generator._call_claude_api("PROMPT")
+    (entry,) = generator.cache_dir.iterdir()
+    stale = time.time() - 120
+    os.utime(entry, (stale, stale))
+
+    assert generator._call_claude_api("PROMPT") == "value = 1"
+    assert generator._call_claude_api("PROMPT") == "value = 1"
+    assert len(generator.client.messages.calls) == 2
+
+
+def test_concurrent_identical_requests_share_one_call(generator):
+    generator.client = _Client(lambda i: _Stream([_fenced(f"value = {i}")], delay=0.2))
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda _: generator._call_claude_api("PROMPT"), range(3)))
+
+    assert results == ["value = 0"] * 3
+    assert len(generator.client.messages.calls) == 1
+
+
+def _api_error(error_class, status_code=None, headers=None):
+    """Build an SDK error without a real HTTP response; only the fields retries read are set."""
+    error = error_class.__new__(error_class)
+    error.status_code = status_code
+    error.response = SimpleNamespace(headers=headers or {})
+    return error
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (_api_error(anthropic.APIStatusError, 429), True),
+    (_api_error(anthropic.APIStatusError, 408), True),
+    (_api_error(anthropic.APIStatusError, 529), True),
+    (_api_error(anthropic.APIStatusError, 400), False),
+    (_api_error(anthropic.APIStatusError, 401), False),
+    (_api_error(anthropic.APIConnectionError), True),
+    (ValueError("bad prompt"), False),
+])
+def test_retry_classification(error, retryable):
+    assert code_generator._is_retryable(error) is retryable
+
+
+def test_retry_delay_honours_retry_after_and_caps_backoff():
+    asks_for_7 = _api_error(anthropic.APIStatusError, 429, {"retry-after": "7"})
+    asks_for_600 = _api_error(anthropic.APIStatusError, 429, {"retry-after": "600"})
+
+    assert code_generator._retry_delay(asks_for_7, 0) >= 7
+    assert code_generator._retry_delay(asks_for_600, 0) <= 30
+    assert 0 <= code_generator._retry_delay(ValueError(), 2) <= 4
+
+
+class _FailingStream(_Stream):
+    def __init__(self, error):
+        super().__init__([])
+        self.error = error
+
+    def __enter__(self):
+        raise self.error
+
+
+def test_transient_errors_are_retried_and_others_are_not(generator, monkeypatch):
+    monkeypatch.setattr(code_generator.time, "sleep", lambda seconds: None)
+    overloaded = _api_error(anthropic.APIStatusError, 529)
+    generator.client = _Client(lambda i: _FailingStream(overloaded) if i == 0 else _Stream(["ok"]))
+
+    assert generator._stream_response_text("PROMPT", "model", 100) == "ok"
+    assert len(generator.client.messages.calls) == 2
+
+    generator.client = _Client(lambda i: _FailingStream(ValueError("bad prompt")))
+    with pytest.raises(ValueError):
+        generator._stream_response_text("PROMPT", "model", 100)
+    assert len(generator.client.messages.calls) == 1
+
+
+class _Clock:
+    """Fake monotonic clock whose sleep advances time instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(code_generator.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(code_generator.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_rate_limiter_paces_requests_after_the_burst(clock):
+    limiter = code_generator._RateLimiter(requests_per_minute=60, tokens_per_minute=0)
+
+    for _ in range(60):
+        limiter.acquire(1000)
+    assert clock.sleeps == []
+
+    limiter.acquire(1000)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_rate_limiter_waits_for_token_budget(clock):
+    limiter = code_generator._RateLimiter(requests_per_minute=0, tokens_per_minute=600)
+
+    limiter.acquire(600)
+    limiter.acquire(300)
+    assert clock.now == pytest.approx(30.0)
+
+    # A request larger than the bucket waits for a full bucket instead of forever
+    limiter.acquire(10_000)
+    assert clock.now == pytest.approx(90.0)
+
+
+def test_disabled_rate_limiter_never_waits(clock):
+    limiter = code_generator._RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+
+    for _ in range(1000):
+        limiter.acquire(100_000)
+
+    assert clock.sleeps == []
+
+
+class _Batches:
+    """Stub of client.messages.batches that ends after one poll, with given results."""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.requests = None
+        self.polls = 0
+
+    def create(self, requests):
+        self.requests = requests
+        return SimpleNamespace(id="batch-1", processing_status="in_progress")
+
+    def retrieve(self, batch_id):
+        self.polls += 1
+        return SimpleNamespace(id=batch_id, processing_status="ended", request_counts={})
+
+    def results(self, batch_id):
+        # Results arrive in any order, keyed only by custom_id
+        for custom_id, code in reversed(list(self.outcomes.items())):
+            if code is None:
+                yield SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type="errored"))
+                continue
+            message = SimpleNamespace(
+                stop_reason="end_turn", content=[SimpleNamespace(type="text", text=_fenced(code))]
+            )
+            yield SimpleNamespace(
+                custom_id=custom_id, result=SimpleNamespace(type="succeeded", message=message)
+            )
+
+
+def test_batch_results_map_back_to_keys_and_failures_are_retried(generator, monkeypatch):
+    monkeypatch.setattr(code_generator.time, "sleep", lambda seconds: None)
+    batches = _Batches({"req-0": "models = 0", "req-1": None, "req-2": "cli = 2"})
+    generator.client = _Client(lambda i: _Stream([_fenced("retried = 1")]))
+    generator.client.messages.batches = batches
+    generator.client.with_options = lambda **options: generator.client
+
+    codes = generator.generate_batch(
+        {"app.models": "P0", "app.api": "P1", "app.cli": "P2"}, {"app.cli": "light-model"}
+    )
+
+    assert codes == {"app.models": "models = 0", "app.api": "retried = 1", "app.cli": "cli = 2"}
+    assert [request["custom_id"] for request in batches.requests] == ["req-0", "req-1", "req-2"]
+    assert [request["params"]["model"] for request in batches.requests] == [
+        generator.model, generator.model, "light-model"
+    ]
+    assert batches.polls == 1
+    assert len(generator.client.messages.calls) == 1
+
+
+def test_single_prompt_skips_the_batch_queue(generator):
+    generator.client = _Client(lambda i: _Stream([_fenced("only = 1")]))
+
+    assert generator.generate_batch({"app.only": "PROMPT"}) == {"app.only": "only = 1"}
+    assert len(generator.client.messages.calls) == 1
+
+
+def _constants_blueprint(*components):
+    return Blueprint(module_name="app.settings", description="Settings.", components=list(components))
+
+
+def test_builtin_only_declarations_render_without_an_api_call(generator):
+    generator.client = _Client(lambda i: pytest.fail("unexpected API call"))
+    blueprint = _constants_blueprint(
+        Component(type="constant", name="RETRIES", value="3", properties={"type": "int"}),
+        Component(type="type_alias", name="Headers", value="dict[str, str]"),
+    )
+
+    code = generator.generate_single_blueprint(blueprint, [])
+
+    assert code == '"""Settings."""\n\nRETRIES: int = 3\nHeaders = dict[str, str]\n'
+
+
+def test_declarations_needing_imports_render_from_a_json_response(generator):
+    response = '{"imports": ["from pathlib import Path"], "definitions": [{"name": "ROOT", "annotation": "Path", "value": "Path(\\"/srv\\")"}]}'
+    generator.client = _Client(lambda i: _Stream([response]))
+    blueprint = _constants_blueprint(Component(type="constant", name="ROOT", value='Path("/srv")'))
+
+    assert code_generator.render_trivial_python(blueprint) is None
+    code = generator.generate_single_blueprint(blueprint, [])
+
+    assert code == '"""Settings."""\n\nfrom pathlib import Path\n\nROOT: Path = Path("/srv")\n'
+    assert len(generator.client.messages.calls) == 1
+
+
+@pytest.mark.parametrize("response", [
+    '{"definitions": [{"name": "OTHER", "value": "1"}]}',
+    '{"definitions": [{"name": "ROOT", "value": "Path("}]}',
+    "not json",
+])
+def test_unusable_declarations_response_falls_back_to_code_generation(generator, monkeypatch, response):
+    monkeypatch.setattr(generator.prompt_builder, "build_single_blueprint_prompt", lambda *args: "PROMPT")
+    responses = [response, _fenced("ROOT = 1")]
+    generator.client = _Client(lambda i: _Stream([responses[i]]))
+    blueprint = _constants_blueprint(Component(type="constant", name="ROOT", value="os.getcwd()"))
+
+    assert generator.generate_single_blueprint(blueprint, []) == "ROOT = 1"
+    assert len(generator.client.messages.calls) == 2
@@ -0,0 +1,16 @@
+"""Tests for the backward-compatible CodeGenerator wrapper."""
+
+from blueprints.generator import CodeGenerator
+
+
+def test_wrapper_keeps_its_compatibility_methods(tmp_path):
+    generator = CodeGenerator(api_key="test-key", cache_dir=tmp_path)
+    core = generator.core_generator
+
+    assert (generator.api_key, generator.model, generator.max_tokens, generator.temperature) == (
+        core.api_key, core.model, core.max_tokens, core.temperature
+    )
+    assert generator.client is core.client
+    assert generator._get_file_extension("python") == ".py"
+    assert generator._extract_code_from_response("```python\nx = 1\n```") == "x = 1"
+    assert generator.generate_single_blueprint.__func__ is CodeGenerator.generate_single_blueprint
@@ -0,0 +1,21 @@
+"""Tests for context curation helpers that do not call Claude."""
+
+import pytest
+
+from blueprints.intelligent_context_curator import IntelligentContextCurator
+
+
+@pytest.fixture
+def curator(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    return IntelligentContextCurator()
+
+
+def test_generated_code_blocks_keep_one_entry_per_module(curator):
+    first = curator._generated_code_block("app.models", "def load():\n    pass\n")
+    assert curator._generated_code_block("app.models", "def load():\n    pass\n") is first
+
+    second = curator._generated_code_block("app.models", "def save():\n    pass\n")
+
+    assert "def save" in second
+    assert len(curator._generated_blocks) == 1
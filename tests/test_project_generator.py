@@ -0,0 +1,196 @@
+"""Tests for project-level generation."""
+
+import io
+import random
+import time
+from contextlib import nullcontext
+from unittest.mock import Mock
+
+import pytest
+
+from blueprints.code_generator import CodeGenerator
+from blueprints.parser import Blueprint, BlueprintReference
+from blueprints.project_generator import ProjectGenerator
+from blueprints.resolver import ResolvedBlueprint
+
+
+def _resolved(blueprint_dir, *module_names):
+    blueprints = [
+        Blueprint(module_name=name, file_path=blueprint_dir / f"{name.split('.')[-1]}.md")
+        for name in module_names
+    ]
+    return ResolvedBlueprint(
+        main=blueprints[-1], dependencies=blueprints[:-1], generation_order=blueprints
+    )
+
+
+class _DeterministicCodeGenerator:
+    """CodeGenerator stand-in whose code depends only on the module and its context.
+
+    Every call sleeps for a random moment, so blueprints finish in a
+    different order on every run.
+    """
+
+    def __init__(self):
+        self.contexts = {}
+
+    def create_blueprint_context(self, blueprint, resolved, generated_context, language):
+        self.contexts[blueprint.module_name] = dict(generated_context)
+        return [f"{name}={code}" for name, code in generated_context.items()]
+
+    def generate_single_blueprint(self, blueprint, context_parts, language):
+        time.sleep(random.uniform(0, 0.01))
+        return f"def {blueprint.module_name}():\n    return {'; '.join(context_parts)!r}\n"
+
+    def generate_with_verification(self, blueprint, context_parts, language, on_candidate=None, **kwargs):
+        candidate = self.generate_single_blueprint(blueprint, context_parts, language)
+        if on_candidate is not None:
+            on_candidate(candidate)
+        time.sleep(random.uniform(0, 0.01))
+        if blueprint.module_name in _REJECTED:
+            # Same API as the candidate, so only an exact comparison notices the change
+            return f"{candidate}# verified\n", []
+        return candidate, []
+
+    def determine_output_path(self, blueprint, output_dir, language, create_dirs=True):
+        return output_dir / f"{blueprint.module_name}.py"
+
+    def save_generated_code(self, code, output_path, force):
+        output_path.write_text(code)
+
+
+# Module -> modules it references: "app" needs "models", which needs "base";
+# "utils" and "cli" form an independent branch
+_GRAPH = {"base": [], "utils": [], "models": ["base"], "cli": ["utils"], "app": ["models"]}
+
+# Modules whose first candidate fails verification and is replaced
+_REJECTED = {"base", "utils"}
+
+
+def _graph_project():
+    blueprints = [
+        Blueprint(
+            module_name=name,
+            requirements=["do something"],
+            blueprint_refs=[BlueprintReference(module_path=dep) for dep in deps],
+        )
+        for name, deps in _GRAPH.items()
+    ]
+    return ResolvedBlueprint(
+        main=blueprints[-1], dependencies=blueprints[:-1], generation_order=blueprints
+    )
+
+
+def _expected_code(name, verify):
+    """Code a blueprint gets when every dependency is generated (and verified) first."""
+    ancestors = set()
+    pending = list(_GRAPH[name])
+    while pending:
+        dep = pending.pop()
+        ancestors.add(dep)
+        pending.extend(_GRAPH[dep])
+    context = "; ".join(
+        f"{dep}={_expected_code(dep, verify)}" for dep in _GRAPH if dep in ancestors
+    )
+    code = f"def {name}():\n    return {context!r}\n"
+    return f"{code}# verified\n" if verify and name in _REJECTED else code
+
+
+def test_individual_generation_passes_only_transitive_dependency_context(tmp_path):
+    for _ in range(5):
+        code_generator = _DeterministicCodeGenerator()
+        generated = ProjectGenerator(code_generator)._generate_project_individual(
+            _graph_project(), tmp_path, "python", {}, force=True, verify=False
+        )
+
+        assert set(generated) == set(_GRAPH)
+        assert code_generator.contexts["base"] == {}
+        assert code_generator.contexts["cli"] == {"utils": _expected_code("utils", False)}
+        assert code_generator.contexts["app"] == {
+            "base": _expected_code("base", False),
+            "models": _expected_code("models", False),
+        }
+
+
+def test_speculative_generation_matches_waiting_for_verification(tmp_path):
+    expected = {name: _expected_code(name, True) for name in _GRAPH}
+    for _ in range(5):
+        generated = ProjectGenerator(_DeterministicCodeGenerator())._generate_project_individual(
+            _graph_project(), tmp_path, "python", {}, force=True, verify=True
+        )
+
+        assert {name: path.read_text() for name, path in generated.items()} == expected
+
+
+def test_existing_concurrent_output_fails_before_generation(tmp_path):
+    # Concurrent generation writes under output_dir, not next to the blueprint files
+    output_dir = tmp_path / "out"
+    existing = output_dir / "app" / "models.py"
+    existing.parent.mkdir(parents=True)
+    existing.write_text("keep = True\n")
+    code_generator = CodeGenerator(api_key="test-key", cache_dir=tmp_path / "cache")
+    code_generator.client = Mock()
+    generator = ProjectGenerator(code_generator)
+
+    with pytest.raises(RuntimeError, match="already exists"):
+        generator.generate_project(
+            _resolved(tmp_path / "specs", "app.models", "api.routes"), output_dir
+        )
+
+    assert existing.read_text() == "keep = True\n"
+    assert not (output_dir / "api").exists()
+    code_generator.client.messages.stream.assert_not_called()
+    code_generator.client.messages.create.assert_not_called()
+
+
+def test_blueprint_without_components_or_requirements_skips_verification():
+    code_generator = Mock()
+    code_generator.generate_single_blueprint.return_value = "x = 1\n"
+    generator = ProjectGenerator(code_generator)
+    blueprint = Blueprint(module_name="app.notes", raw_content="# app.notes\nJust prose.\n")
+
+    code = generator._generate_code_with_verification(blueprint, [], "python", True, None)
+
+    assert code == "x = 1\n"
+    code_generator.generate_with_verification.assert_not_called()
+
+
+class _FailingCodeGenerator(_DeterministicCodeGenerator):
+    def generate_single_blueprint(self, blueprint, context_parts, language):
+        raise RuntimeError("API unavailable")
+
+
+@pytest.mark.parametrize("code_generator, writes_makefile", [
+    (_DeterministicCodeGenerator(), True),
+    (_FailingCodeGenerator(), False),
+])
+def test_makefile_is_written_only_after_generation_succeeds(tmp_path, code_generator, writes_makefile):
+    resolved = _resolved(tmp_path, "app.models", "app.main")
+    generator = ProjectGenerator(code_generator)
+
+    expectation = nullcontext() if writes_makefile else pytest.raises(RuntimeError, match="API unavailable")
+
+    with expectation:
+        generator.generate_project(
+            resolved, tmp_path / "out", verify=False, use_concurrent_processing=False
+        )
+
+    assert (tmp_path / "Makefile").exists() == writes_makefile
+
+
+@pytest.mark.parametrize("answer, overwrites", [("y\n", True), ("n\n", False)])
+def test_single_file_overwrite_answer_is_read_from_piped_stdin(tmp_path, monkeypatch, answer, overwrites):
+    output_path = tmp_path / "models.py"
+    output_path.write_text("keep = True\n")
+    monkeypatch.setattr("sys.stdin", io.StringIO(answer))
+    code_generator = Mock()
+    code_generator.generate_single_blueprint.return_value = "x = 1\n"
+    expectation = nullcontext() if overwrites else pytest.raises(RuntimeError, match="cancelled")
+
+    with expectation:
+        ProjectGenerator(code_generator).generate_single_with_context(
+            _resolved(tmp_path, "models"), output_path, verify=False
+        )
+
+    assert code_generator.write_text_atomic.called == overwrites
+    assert code_generator.create_comprehensive_context.called == overwrites